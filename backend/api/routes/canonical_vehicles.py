@@ -25,7 +25,7 @@ async def get_canonical_vehicles(
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     brand: Optional[str] = Query(None, description="Filter by brand"),
     model: Optional[str] = Query(None, description="Filter by model"),
-    year: Optional[str] = Query(None, description="Filter by year"),
+    year: Optional[int] = Query(None, description="Filter by year"),
     canonical_service: CanonicalVehicleService = Depends(get_canonical_service)
 ):
     """Get canonical vehicles with pagination and filters"""
@@ -118,7 +118,7 @@ async def update_canonical_vehicle(
             raise HTTPException(status_code=404, detail="Canonical vehicle not found")
         
         # Update canonical vehicle
-        update_dict = update_data.dict(exclude_unset=True)
+        update_dict = update_data.model_dump(exclude_unset=True)
         await canonical_service.canonical_vehicles_collection.update_one(
             {"_id": canonical_id},
             {"$set": update_dict}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 from typing import Dict, Any, List, Optional
 import uuid
 import logging
@@ -40,7 +40,7 @@ async def start_bulk_scraping(
         )
         
         # Save job to database
-        await db.scraping_jobs.insert_one(job.dict(by_alias=True))
+        await db.scraping_jobs.insert_one(job.model_dump(by_alias=True))
         
         # Start background task
         background_tasks.add_task(
@@ -80,7 +80,7 @@ async def scrape_single_vehicle(
         )
         
         # Save job to database
-        await db.scraping_jobs.insert_one(job.dict(by_alias=True))
+        await db.scraping_jobs.insert_one(job.model_dump(by_alias=True))
         
         # Start background task
         background_tasks.add_task(
@@ -254,16 +254,10 @@ async def run_bulk_scraping_task(job_id: str, max_pages: Optional[int], db):
         
         # Start scraping with incremental saving
         async with MercadoLibreScraper(websocket_manager) as scraper:
-            all_vehicles = await scraper.scrape_all_listings_with_incremental_save(
+            total_vehicles, saved_count, failed_count = await scraper.scrape_all_listings_with_incremental_save(
                 job_id, max_pages, vehicle_service, db
             )
             
-            # Get final job stats from database
-            final_job = await db.scraping_jobs.find_one({"_id": job_id})
-            total_vehicles = len(all_vehicles)
-            saved_count = final_job.get("successful_items", 0) if final_job else 0
-            failed_count = final_job.get("failed_items", 0) if final_job else 0
-            
             # Send completion notification
             await websocket_manager.send_scraping_update(
                 job_id,
@@ -334,7 +328,7 @@ async def run_single_vehicle_scraping_task(
             
             # Update job completion
             results = {
-                "vehicle_data": vehicle_data.dict(),
+                "vehicle_data": vehicle_data.model_dump(),
                 "saved_to_db": save_to_db,
                 "database_id": str(saved_vehicle.get("_id")) if saved_vehicle else None
             }
@@ -360,7 +354,7 @@ async def run_single_vehicle_scraping_task(
                 job_id,
                 ScrapingJobStatus.COMPLETED,
                 progress_percentage=100,
-                vehicle_data=vehicle_data.dict(),
+                vehicle_data=vehicle_data.model_dump(),
                 saved_to_db=save_to_db,
                 message=f"Single vehicle scraping completed! Scraped: {vehicle_data.title}"
             )
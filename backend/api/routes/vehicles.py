@@ -316,7 +316,7 @@ async def get_time_series_summary(
         ]
         
         vehicle_service = VehicleService(db)
-        cursor = vehicle_service.price_history_collection.aggregate(pipeline)
+        cursor = await vehicle_service.price_history_collection.aggregate(pipeline)
         summary_data = await cursor.to_list(length=None)
         
         return {
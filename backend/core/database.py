@@ -1,5 +1,5 @@
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient, IndexModel
 import redis.asyncio as redis
 from typing import Optional
 import logging
@@ -12,14 +12,14 @@ class Database:
     """Database connection manager"""
     
     def __init__(self):
-        self.mongodb_client: Optional[AsyncIOMotorClient] = None
+        self.mongodb_client: Optional[AsyncMongoClient] = None
         self.mongodb_db = None
         self.redis_client: Optional[redis.Redis] = None
 
     async def connect_mongodb(self):
         """Connect to MongoDB"""
         try:
-            self.mongodb_client = AsyncIOMotorClient(settings.DATABASE_URL)
+            self.mongodb_client = AsyncMongoClient(settings.DATABASE_URL)
             self.mongodb_db = self.mongodb_client[settings.DATABASE_NAME]
             
             # Test the connection
@@ -49,7 +49,7 @@ class Database:
     async def disconnect_mongodb(self):
         """Disconnect from MongoDB"""
         if self.mongodb_client:
-            self.mongodb_client.close()
+            await self.mongodb_client.close()
             logger.info("MongoDB disconnected")
 
     async def disconnect_redis(self):
@@ -63,21 +63,40 @@ class Database:
         try:
             # Vehicle listings indexes
             await self.mongodb_db.vehicles.create_index([("mercadolibre_id", 1)], unique=True)
-            await self.mongodb_db.vehicles.create_index([("title", "text")])
-            await self.mongodb_db.vehicles.create_index([("price", 1)])
-            await self.mongodb_db.vehicles.create_index([("price_numeric", 1)])
-            await self.mongodb_db.vehicles.create_index([("year", 1)])
-            await self.mongodb_db.vehicles.create_index([("location", 1)])
-            await self.mongodb_db.vehicles.create_index([("brand", 1), ("model", 1)])
-            await self.mongodb_db.vehicles.create_index([("canonical_vehicle_id", 1)])
-            await self.mongodb_db.vehicles.create_index([("status", 1)])
-            await self.mongodb_db.vehicles.create_index([("created_at", -1)])
-            await self.mongodb_db.vehicles.create_index([("updated_at", -1)])
+            # Search matches partial words with regexes, so the multi-field text index is unused;
+            # drop it where an earlier startup built it (only one text index is allowed)
+            vehicle_indexes = await self.mongodb_db.vehicles.index_information()
+            if "vehicle_search_text" in vehicle_indexes:
+                await self.mongodb_db.vehicles.drop_index("vehicle_search_text")
+            # Compound indexes follow search_vehicles' status filter and updated_at sort,
+            # so paginated searches read pages off the index instead of sorting in memory
+            await self.mongodb_db.vehicles.create_indexes([
+                IndexModel([("title", "text")]),
+                IndexModel([("status", 1), ("updated_at", -1)]),
+                IndexModel([("status", 1), ("updated_at", -1), ("price_numeric", 1)]),
+                IndexModel([("brand_lc", 1), ("status", 1), ("updated_at", -1)]),
+                IndexModel([("price", 1)]),
+                IndexModel([("price_numeric", 1)]),
+                IndexModel([("price_drop_pct", -1)]),
+                IndexModel([("year", 1)]),
+                IndexModel([("kilometers_numeric", 1)]),
+                IndexModel([("location", 1)]),
+                # Lowercase copies used by the prefix search filters
+                IndexModel([("model_lc", 1)]),
+                IndexModel([("location_lc", 1)]),
+                IndexModel([("fuel_type_lc", 1)]),
+                IndexModel([("transmission_lc", 1)]),
+                IndexModel([("brand", 1), ("model", 1)]),
+                IndexModel([("canonical_vehicle_id", 1)]),
+                IndexModel([("created_at", -1)]),
+                IndexModel([("updated_at", -1)])
+            ])
             
             # Canonical vehicles indexes
             await self.mongodb_db.canonical_vehicles.create_index([("brand", 1), ("model", 1)])
             await self.mongodb_db.canonical_vehicles.create_index([("brand", 1), ("model", 1), ("year", 1)])
             await self.mongodb_db.canonical_vehicles.create_index([("brand", 1), ("model", 1), ("edition", 1)])
+            await self.mongodb_db.canonical_vehicles.create_index([("normalized.brand", 1), ("normalized.model", 1), ("year", 1)])
             await self.mongodb_db.canonical_vehicles.create_index([("status", 1)])
             await self.mongodb_db.canonical_vehicles.create_index([("total_listings", -1)])
             await self.mongodb_db.canonical_vehicles.create_index([("active_listings", -1)])
@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
 from contextlib import asynccontextmanager
 import asyncio
@@ -40,7 +40,9 @@ app = FastAPI(
     title="MercadoSniper API",
     description="Intelligent Price Tracking System for MercadoLibre Colombia",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Route responses are encoded with orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
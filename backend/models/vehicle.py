@@ -1,8 +1,21 @@
-from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, BeforeValidator, Field, HttpUrl
+from typing import Annotated, Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 import bson
+import re
+
+_YEAR_RE = re.compile(r'\d{4}')
+
+def parse_year(year: Any) -> Optional[int]:
+    """Parse a year into an int; scraped placeholders such as "Not found" become None"""
+    if year is None or isinstance(year, int):
+        return year
+    match = _YEAR_RE.search(str(year))
+    return int(match.group()) if match else None
+
+# Years are stored as ints so range filters can use the year index
+Year = Annotated[Optional[int], BeforeValidator(parse_year)]
 
 class VehicleStatus(str, Enum):
     """Vehicle status enumeration"""
@@ -21,7 +34,7 @@ class CanonicalVehicleCreate(BaseModel):
     """Canonical vehicle creation model"""
     brand: str = Field(..., description="Vehicle brand")
     model: str = Field(..., description="Vehicle model")
-    year: Optional[str] = Field(None, description="Vehicle year")
+    year: Year = Field(None, description="Vehicle year")
     edition: Optional[str] = Field(None, description="Vehicle edition/trim")
     engine: Optional[str] = Field(None, description="Engine specifications")
     transmission: Optional[str] = Field(None, description="Transmission type")
@@ -37,7 +50,7 @@ class CanonicalVehicle(BaseModel):
     id: Optional[str] = Field(None, alias="_id")
     brand: str
     model: str
-    year: Optional[str] = None
+    year: Year = None
     edition: Optional[str] = None
     engine: Optional[str] = None
     transmission: Optional[str] = None
@@ -78,7 +91,7 @@ class CanonicalVehicleUpdate(BaseModel):
     """Canonical vehicle update model"""
     brand: Optional[str] = None
     model: Optional[str] = None
-    year: Optional[str] = None
+    year: Year = None
     edition: Optional[str] = None
     engine: Optional[str] = None
     transmission: Optional[str] = None
@@ -98,7 +111,7 @@ class VehicleCreate(BaseModel):
     price_numeric: Optional[float] = Field(None, description="Current price as number")
     mercadolibre_id: str = Field(..., description="MercadoLibre listing ID")
     url: str = Field(..., description="MercadoLibre URL")
-    year: Optional[str] = Field(None, description="Vehicle year")
+    year: Year = Field(None, description="Vehicle year")
     kilometers: Optional[str] = Field(None, description="Vehicle kilometers")
     location: Optional[str] = Field(None, description="Vehicle location")
     image_url: Optional[str] = Field(None, description="Main image URL")
@@ -119,10 +132,14 @@ class Vehicle(BaseModel):
     title: str
     price: Optional[str] = None
     price_numeric: Optional[float] = None
+    previous_price_numeric: Optional[float] = None
+    price_drop_pct: Optional[float] = None
+    price_updated_at: Optional[datetime] = None
     mercadolibre_id: str
     url: str
-    year: Optional[str] = None
+    year: Year = None
     kilometers: Optional[str] = None
+    kilometers_numeric: Optional[int] = None
     location: Optional[str] = None
     image_url: Optional[str] = None
     brand: Optional[str] = None
@@ -149,12 +166,29 @@ class Vehicle(BaseModel):
             datetime: lambda v: v.isoformat()
         }
 
+    @classmethod
+    def list_fields(cls) -> Dict[str, int]:
+        """MongoDB projection with the fields shown in vehicle list views"""
+        return dict(_VEHICLE_LIST_PROJECTION)
+
+# Everything list views render; only these additional_info keys are shown on vehicle cards
+_VEHICLE_LIST_PROJECTION = {
+    field: 1 for field in Vehicle.model_fields
+    if field not in ("id", "additional_info", "last_scraped_at")
+}
+_VEHICLE_LIST_PROJECTION.update({
+    "additional_info.condition": 1,
+    "additional_info.original_price": 1,
+    "additional_info.features": 1,
+    "additional_info.seller": 1
+})
+
 class VehicleUpdate(BaseModel):
     """Vehicle update model"""
     title: Optional[str] = None
     price: Optional[str] = None
     price_numeric: Optional[float] = None
-    year: Optional[str] = None
+    year: Year = None
     kilometers: Optional[str] = None
     location: Optional[str] = None
     image_url: Optional[str] = None
@@ -177,6 +211,18 @@ class PriceHistory(BaseModel):
     price_numeric: float = Field(..., description="Price as number")
     scraping_session_id: Optional[str] = Field(None, description="Reference to scraping session")
     
+    @classmethod
+    def chart_fields(cls) -> Dict[str, int]:
+        """MongoDB projection with the fields needed to chart and analyze a price history"""
+        return {
+            "_id": 0,
+            "timestamp": 1,
+            "price": 1,
+            "price_numeric": 1,
+            "metadata.vehicle_id": 1,
+            "metadata.mercadolibre_id": 1
+        }
+
     @classmethod
     def create_from_vehicle_data(
         cls,
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Backfill script for the indexed search fields derived from scraped vehicle data.
+Vehicles saved before a derived field existed only get it on their next scrape;
+this script recomputes the fields for every vehicle in the database. It also
+converts years stored as strings by older versions to ints, in both vehicles and
+canonical vehicles, so year range filters can use the index, and stores the
+normalized match fields on canonical vehicles created before they existed.
+"""
+
+import asyncio
+import logging
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pymongo import AsyncMongoClient, UpdateOne
+from core.config import settings
+from models.vehicle import parse_year
+from services.canonical_vehicle_service import normalized_match_fields
+from services.vehicle_service import derive_search_fields
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Scraped fields the derived search fields are computed from
+SOURCE_FIELDS = {
+    "kilometers": 1,
+    "year": 1,
+    "brand": 1,
+    "model": 1,
+    "location": 1,
+    "fuel_type": 1,
+    "transmission": 1
+}
+
+# Canonical vehicles with years saved as strings, or created before normalized match fields were stored
+CANONICAL_BACKFILL_QUERY = {"$or": [{"year": {"$type": "string"}}, {"normalized": {"$exists": False}}]}
+
+# Canonical fields the backfilled values are computed from
+CANONICAL_SOURCE_FIELDS = {"year": 1, "brand": 1, "model": 1, "edition": 1}
+
+
+async def _bulk_update(collection, operations) -> int:
+    """Write a batch of updates, returning how many documents changed"""
+    result = await collection.bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+async def backfill_search_fields(batch_size: int = 500):
+    """Recompute derived search fields for all vehicles, writing them in bulk batches"""
+    client = AsyncMongoClient(settings.DATABASE_URL)
+    try:
+        db = client[settings.DATABASE_NAME]
+        await client.admin.command('ping')
+        logger.info("Connected to MongoDB successfully")
+
+        updated = 0
+        operations = []
+        async for vehicle in db.vehicles.find({}, SOURCE_FIELDS):
+            fields = derive_search_fields(vehicle)
+            if isinstance(vehicle.get("year"), str):
+                fields["year"] = parse_year(vehicle["year"])
+            if fields:
+                operations.append(UpdateOne({"_id": vehicle["_id"]}, {"$set": fields}))
+            if len(operations) >= batch_size:
+                updated += await _bulk_update(db.vehicles, operations)
+                operations = []
+
+        if operations:
+            updated += await _bulk_update(db.vehicles, operations)
+
+        logger.info(f"Backfill completed: {updated} vehicles updated")
+
+        canonical_updated = 0
+        operations = []
+        async for canonical in db.canonical_vehicles.find(CANONICAL_BACKFILL_QUERY, CANONICAL_SOURCE_FIELDS):
+            fields = {"normalized": normalized_match_fields(canonical)}
+            if isinstance(canonical.get("year"), str):
+                fields["year"] = parse_year(canonical["year"])
+            operations.append(UpdateOne({"_id": canonical["_id"]}, {"$set": fields}))
+            if len(operations) >= batch_size:
+                canonical_updated += await _bulk_update(db.canonical_vehicles, operations)
+                operations = []
+
+        if operations:
+            canonical_updated += await _bulk_update(db.canonical_vehicles, operations)
+
+        logger.info(f"Canonical backfill completed: {canonical_updated} canonical vehicles updated")
+
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_search_fields())
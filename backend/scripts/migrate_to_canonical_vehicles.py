@@ -18,7 +18,7 @@ from datetime import datetime
 # Add the backend directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
 from core.config import settings
 from services.canonical_vehicle_service import CanonicalVehicleService
 from services.vehicle_service import VehicleService
@@ -52,7 +52,7 @@ class CanonicalVehicleMigration:
     async def connect_database(self):
         """Connect to MongoDB database"""
         try:
-            self.client = AsyncIOMotorClient(settings.DATABASE_URL)
+            self.client = AsyncMongoClient(settings.DATABASE_URL)
             self.db = self.client[settings.DATABASE_NAME]
             
             # Test connection
@@ -70,7 +70,7 @@ class CanonicalVehicleMigration:
     async def disconnect_database(self):
         """Disconnect from MongoDB"""
         if self.client:
-            self.client.close()
+            await self.client.close()
             logger.info("Disconnected from MongoDB")
 
     async def get_vehicles_without_canonical(self) -> List[Dict[str, Any]]:
@@ -1,11 +1,14 @@
 import asyncio
+from functools import lru_cache
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import logging
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 import re
+import sys
 from difflib import SequenceMatcher
 from bson import ObjectId
+import numpy as np
 
 from models.vehicle import (
     CanonicalVehicle,
@@ -18,10 +21,76 @@ from models.vehicle import (
 
 logger = logging.getLogger(__name__)
 
+# Fields compared when scoring a vehicle against a canonical vehicle, and their weights.
+# Year is an integer compare, so it runs before the model string ratio to prune early.
+_SIMILARITY_FIELDS = ("brand", "year", "model", "edition", "engine")
+_SIMILARITY_WEIGHTS = np.array([0.25, 0.2, 0.25, 0.2, 0.1])
+
+# Patterns used by _normalize_string
+_SEPARATOR_RE = re.compile(r'[-_]+')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Numeric values in engine specifications
+_ENGINE_NUMBER_RE = re.compile(r'\d+\.?\d*')
+
+# Body types and the title keywords identifying them, in priority order
+_BODY_TYPES = {
+    'sedan': ['sedan', 'sedán'],
+    'hatchback': ['hatchback', 'hatch'],
+    'suv': ['suv', 'camioneta'],
+    'pickup': ['pickup', 'pick up', 'pick-up'],
+    'coupe': ['coupe', 'coupé'],
+    'convertible': ['convertible', 'cabrio'],
+    'wagon': ['wagon', 'familiar'],
+    'van': ['van', 'furgon', 'furgón']
+}
+
+# Similarity fields compared as normalized strings, stored pre-normalized on canonical vehicles
+_NORMALIZED_FIELDS = ("brand", "model", "edition")
+
+
+@lru_cache(maxsize=16384)
+def _string_ratio(a: str, b: str) -> float:
+    """SequenceMatcher ratio of two normalized strings, memoized across lookups"""
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+@lru_cache(maxsize=16384)
+def _string_ratio_bound(a: str, b: str) -> float:
+    """Cheap upper bound of _string_ratio, from character counts alone"""
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).quick_ratio()
+
+
+@lru_cache(maxsize=8192)
+def _canonical_title(brand: Optional[str], model: Optional[str], year: Optional[int], edition: Optional[str]) -> str:
+    """Standardized canonical title, memoized since groups share brand/model/year/edition"""
+    parts = []
+    
+    if brand:
+        parts.append(brand.title())
+    if model:
+        parts.append(model.title())
+    if year:
+        parts.append(str(year))
+    if edition:
+        parts.append(edition.title())
+    
+    return " ".join(parts)
+
+
+def normalized_match_fields(canonical: Dict[str, Any]) -> Dict[str, str]:
+    """Normalized brand, model and edition stored on canonical vehicles for matching"""
+    return {field: CanonicalVehicleService._normalize_string(canonical.get(field)) for field in _NORMALIZED_FIELDS}
+
 class CanonicalVehicleService:
     """Service for canonical vehicle operations and grouping logic"""
     
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncDatabase):
         self.db = db
         self.canonical_vehicles_collection = db.canonical_vehicles
         self.vehicles_collection = db.vehicles
@@ -30,13 +99,14 @@ class CanonicalVehicleService:
     async def create_canonical_vehicle(self, canonical_data: CanonicalVehicleCreate) -> CanonicalVehicle:
         """Create a new canonical vehicle"""
         try:
-            canonical_dict = canonical_data.dict()
+            canonical_dict = canonical_data.model_dump()
             canonical_dict["created_at"] = datetime.utcnow()
             canonical_dict["updated_at"] = datetime.utcnow()
             canonical_dict["status"] = CanonicalVehicleStatus.ACTIVE
             canonical_dict["total_listings"] = 0
             canonical_dict["active_listings"] = 0
             canonical_dict["total_views"] = 0
+            canonical_dict["normalized"] = normalized_match_fields(canonical_dict)
             
             # Generate canonical title if not provided
             if not canonical_dict.get("canonical_title"):
@@ -56,41 +126,64 @@ class CanonicalVehicleService:
         """Find existing canonical vehicle or create new one based on vehicle data"""
         try:
             # First, try to find an existing canonical vehicle
-            canonical_id = await self._find_matching_canonical(vehicle_data)
+            match = await self._find_matching_canonical_document(vehicle_data)
             
-            if canonical_id:
-                return canonical_id
+            if match:
+                return str(match["_id"])
             
             # If no match found, create a new canonical vehicle
-            canonical_create = CanonicalVehicleCreate(
-                brand=vehicle_data.brand or "Unknown",
-                model=vehicle_data.model or "Unknown",
-                year=vehicle_data.year,
-                edition=vehicle_data.edition,
-                engine=vehicle_data.engine,
-                transmission=vehicle_data.transmission,
-                fuel_type=vehicle_data.fuel_type,
-                doors=vehicle_data.doors,
-                body_type=self._extract_body_type(vehicle_data.title),
-                specifications=self._extract_specifications(vehicle_data)
-            )
-            
-            canonical_vehicle = await self.create_canonical_vehicle(canonical_create)
+            canonical_vehicle = await self._create_canonical_for(vehicle_data)
             return canonical_vehicle.id
             
         except Exception as e:
             logger.error(f"Error finding/creating canonical vehicle: {e}")
             return None
 
+    async def get_or_create_canonical_vehicle(self, vehicle_data: VehicleCreate) -> Optional[CanonicalVehicle]:
+        """Find or create the canonical vehicle for vehicle data, returning the canonical vehicle itself"""
+        try:
+            match = await self._find_matching_canonical_document(vehicle_data)
+            
+            if match:
+                return CanonicalVehicle(**{**match, "_id": str(match["_id"])})
+            
+            return await self._create_canonical_for(vehicle_data)
+            
+        except Exception as e:
+            logger.error(f"Error finding/creating canonical vehicle: {e}")
+            return None
+
+    async def _create_canonical_for(self, vehicle_data: VehicleCreate) -> CanonicalVehicle:
+        """Create a new canonical vehicle from vehicle data"""
+        canonical_create = CanonicalVehicleCreate(
+            brand=vehicle_data.brand or "Unknown",
+            model=vehicle_data.model or "Unknown",
+            year=vehicle_data.year,
+            edition=vehicle_data.edition,
+            engine=vehicle_data.engine,
+            transmission=vehicle_data.transmission,
+            fuel_type=vehicle_data.fuel_type,
+            doors=vehicle_data.doors,
+            body_type=self._extract_body_type(vehicle_data.title),
+            specifications=self._extract_specifications(vehicle_data)
+        )
+        
+        return await self.create_canonical_vehicle(canonical_create)
+
     async def _find_matching_canonical(self, vehicle_data: VehicleCreate) -> Optional[str]:
         """Find matching canonical vehicle using similarity algorithms"""
+        match = await self._find_matching_canonical_document(vehicle_data)
+        return str(match["_id"]) if match else None
+
+    async def _find_matching_canonical_document(self, vehicle_data: VehicleCreate) -> Optional[Dict[str, Any]]:
+        """Find the matching canonical vehicle document using similarity algorithms"""
         try:
-            # Build query for potential matches
+            # Build query for potential matches, blocked on the indexed normalized fields
             query = {}
             if vehicle_data.brand:
-                query["brand"] = {"$regex": f"^{re.escape(vehicle_data.brand)}$", "$options": "i"}
+                query["normalized.brand"] = self._normalize_string(vehicle_data.brand)
             if vehicle_data.model:
-                query["model"] = {"$regex": f"^{re.escape(vehicle_data.model)}$", "$options": "i"}
+                query["normalized.model"] = self._normalize_string(vehicle_data.model)
             if vehicle_data.year:
                 query["year"] = vehicle_data.year
             
@@ -101,27 +194,33 @@ class CanonicalVehicleService:
                 # Check for exact matches with additional criteria
                 for candidate in candidates:
                     if self._is_exact_match(vehicle_data, candidate):
-                        return str(candidate["_id"])
+                        return candidate
                 
-                # Check for fuzzy matches
-                for candidate in candidates:
-                    similarity_score = self._calculate_similarity(vehicle_data, candidate)
-                    if similarity_score >= 0.90:  # 90% similarity threshold (more strict)
-                        return str(candidate["_id"])
+                # Check for fuzzy matches, keeping the best scoring candidate
+                if candidates:
+                    scores = self._calculate_similarity_batch(vehicle_data, candidates, threshold=0.90)
+                    best = int(scores.argmax())
+                    if scores[best] >= 0.90:  # 90% similarity threshold (more strict)
+                        return candidates[best]
             
             # If no good matches found with specific criteria, do a broader fuzzy search
             if vehicle_data.brand and vehicle_data.model:
                 broad_query = {
-                    "brand": {"$regex": vehicle_data.brand, "$options": "i"},
-                    "model": {"$regex": vehicle_data.model, "$options": "i"}
+                    "brand": {"$regex": re.escape(vehicle_data.brand), "$options": "i"},
+                    "model": {"$regex": re.escape(vehicle_data.model), "$options": "i"}
                 }
+                # A year mismatch caps the score below the broad threshold, so only
+                # canonicals of the same (or unknown) year can match
+                if vehicle_data.year:
+                    broad_query["year"] = {"$in": [vehicle_data.year, None]}
                 
                 broad_candidates = await self.canonical_vehicles_collection.find(broad_query).to_list(length=50)
                 
-                for candidate in broad_candidates:
-                    similarity_score = self._calculate_similarity(vehicle_data, candidate)
-                    if similarity_score >= 0.95:  # Higher threshold for broad search
-                        return str(candidate["_id"])
+                if broad_candidates:
+                    scores = self._calculate_similarity_batch(vehicle_data, broad_candidates, threshold=0.95)
+                    best = int(scores.argmax())
+                    if scores[best] >= 0.95:  # Higher threshold for broad search
+                        return broad_candidates[best]
             
             return None
             
@@ -132,9 +231,9 @@ class CanonicalVehicleService:
     def _is_exact_match(self, vehicle_data: VehicleCreate, canonical: Dict[str, Any]) -> bool:
         """Check if vehicle data exactly matches canonical vehicle"""
         # Brand and model must match (case insensitive)
-        if not self._normalize_string(vehicle_data.brand) == self._normalize_string(canonical.get("brand")):
+        if not self._normalize_string(vehicle_data.brand) == self._normalized_field(canonical, "brand"):
             return False
-        if not self._normalize_string(vehicle_data.model) == self._normalize_string(canonical.get("model")):
+        if not self._normalize_string(vehicle_data.model) == self._normalized_field(canonical, "model"):
             return False
         
         # Year must match if both are present
@@ -144,7 +243,7 @@ class CanonicalVehicleService:
         
         # Edition must match if both are present
         if vehicle_data.edition and canonical.get("edition"):
-            if not self._normalize_string(vehicle_data.edition) == self._normalize_string(canonical["edition"]):
+            if not self._normalize_string(vehicle_data.edition) == self._normalized_field(canonical, "edition"):
                 return False
         
         # Engine must match if both are present and specific
@@ -154,125 +253,146 @@ class CanonicalVehicleService:
         
         return True
 
+    def _normalized_field(self, canonical: Dict[str, Any], field: str) -> str:
+        """Normalized value of a canonical vehicle field, as stored at insert time"""
+        stored = canonical.get("normalized", {}).get(field)
+        if stored is not None:
+            return stored
+        # Canonicals created before normalized fields were stored fall back to normalizing here
+        return self._normalize_string(canonical.get(field))
+
     def _calculate_similarity(self, vehicle_data: VehicleCreate, canonical: Dict[str, Any]) -> float:
         """Calculate similarity score between vehicle data and canonical vehicle"""
-        score = 0.0
-        total_weight = 0.0
-        
-        # Brand similarity (weight: 0.25)
-        if vehicle_data.brand and canonical.get("brand"):
-            brand_sim = SequenceMatcher(None, 
-                self._normalize_string(vehicle_data.brand),
-                self._normalize_string(canonical["brand"])
-            ).ratio()
-            score += brand_sim * 0.25
-            total_weight += 0.25
-        
-        # Model similarity (weight: 0.25)
-        if vehicle_data.model and canonical.get("model"):
-            model_sim = SequenceMatcher(None,
-                self._normalize_string(vehicle_data.model),
-                self._normalize_string(canonical["model"])
-            ).ratio()
-            score += model_sim * 0.25
-            total_weight += 0.25
-        
-        # Year similarity (weight: 0.2)
-        if vehicle_data.year and canonical.get("year"):
-            if vehicle_data.year == canonical["year"]:
-                score += 0.2
-            else:
-                # Different years get no score - they should be separate canonical vehicles
-                pass
-            total_weight += 0.2
-        
-        # Edition similarity (weight: 0.2) - Increased from 0.1 to make editions more distinct
-        if vehicle_data.edition and canonical.get("edition"):
-            edition_sim = SequenceMatcher(None,
-                self._normalize_string(vehicle_data.edition),
-                self._normalize_string(canonical["edition"])
-            ).ratio()
-            score += edition_sim * 0.2
-            total_weight += 0.2
+        return float(self._calculate_similarity_batch(vehicle_data, [canonical])[0])
+
+    def _calculate_similarity_batch(
+        self,
+        vehicle_data: VehicleCreate,
+        candidates: List[Dict[str, Any]],
+        threshold: float = 0.0
+    ) -> np.ndarray:
+        """Calculate similarity scores between vehicle data and each candidate canonical vehicle.
+
+        Each field is compared once per distinct candidate value; the score is the weighted
+        average over the fields present on both sides. Fields are compared cheapest and
+        most discriminating first, and candidates that can no longer reach the threshold stop being
+        compared, keeping their partial score. String ratios that cannot keep any candidate
+        above the threshold are replaced by their upper bound, which prunes them the same way.
+        """
+        score = np.zeros(len(candidates))
+        total_weight = np.zeros(len(candidates))
+        active = np.ones(len(candidates), dtype=bool)
         
-        # Engine similarity (weight: 0.1)
-        if vehicle_data.engine and canonical.get("engine"):
-            engine_sim = 1.0 if self._similar_engines(vehicle_data.engine, canonical["engine"]) else 0.0
-            score += engine_sim * 0.1
-            total_weight += 0.1
+        for column, field in enumerate(_SIMILARITY_FIELDS):
+            weight = _SIMILARITY_WEIGHTS[column]
+            value = getattr(vehicle_data, field)
+            if value:
+                normalized = field in _NORMALIZED_FIELDS
+                if normalized:
+                    value = self._normalize_string(value)
+                cutoff = 0.0
+                if threshold:
+                    # Lowest field score that keeps some candidate able to reach the threshold
+                    remaining_weight = _SIMILARITY_WEIGHTS[column:].sum()
+                    need = np.minimum(
+                        threshold * (total_weight + remaining_weight) - score - (remaining_weight - weight),
+                        threshold * (total_weight + weight) - score
+                    ) / weight
+                    cutoff = need[active].min(initial=1.0) - 1e-9
+                field_scores = {}
+                for row, candidate in enumerate(candidates):
+                    other = candidate.get(field)
+                    if not other or not active[row]:
+                        continue
+                    if normalized:
+                        other = self._normalized_field(candidate, field)
+                    if other not in field_scores:
+                        field_scores[other] = self._field_similarity(field, value, other, cutoff)
+                    score[row] += field_scores[other] * weight
+                    total_weight[row] += weight
+            
+            remaining_weight = _SIMILARITY_WEIGHTS[column + 1:].sum()
+            if threshold and remaining_weight:
+                # Remaining fields can at best all match, or be missing and leave the average as is
+                current = np.divide(score, total_weight, out=np.zeros_like(score), where=total_weight > 0)
+                best_case = np.maximum((score + remaining_weight) / (total_weight + remaining_weight), current)
+                active &= best_case >= threshold
         
-        return score / total_weight if total_weight > 0 else 0.0
+        return np.divide(score, total_weight, out=np.zeros_like(score), where=total_weight > 0)
 
-    def _normalize_string(self, text: str) -> str:
+    def _field_similarity(self, field: str, value: Any, other: Any, cutoff: float = 0.0) -> float:
+        """Similarity of a single field between vehicle data and a canonical vehicle.
+
+        Values of normalized fields are expected to be normalized already. String
+        similarities known to fall below the cutoff return their upper bound instead.
+        """
+        if field == "year":
+            # Different years get no score - they should be separate canonical vehicles
+            return 1.0 if value == other else 0.0
+        if field == "engine":
+            return 1.0 if self._similar_engines(value, other) else 0.0
+        if cutoff > 0:
+            bound = _string_ratio_bound(value, other)
+            if bound < cutoff:
+                return bound
+        return _string_ratio(value, other)
+
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _normalize_string(text: str) -> str:
         """Normalize string for comparison"""
         if not text:
             return ""
         # Replace hyphens and underscores with spaces, then remove other punctuation
-        text = re.sub(r'[-_]+', ' ', text)
-        text = re.sub(r'[^\w\s]', '', text)
+        text = _SEPARATOR_RE.sub(' ', text)
+        text = _PUNCTUATION_RE.sub('', text)
         # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
-        return text.lower().strip()
+        text = _WHITESPACE_RE.sub(' ', text)
+        # Interned so equal normalized values are the same object, making the
+        # equality checks and ratio cache lookups in scoring identity compares
+        return sys.intern(text.lower().strip())
 
     def _similar_engines(self, engine1: str, engine2: str) -> bool:
         """Check if two engine specifications are similar"""
         if not engine1 or not engine2:
             return False
         
-        # Extract numeric values (displacement, power, etc.)
-        engine1_numbers = re.findall(r'\d+\.?\d*', engine1.lower())
-        engine2_numbers = re.findall(r'\d+\.?\d*', engine2.lower())
+        engine1_numbers, engine1_words = self._engine_features(engine1)
+        engine2_numbers, engine2_words = self._engine_features(engine2)
         
         # Check if they share significant numeric values
         for num1 in engine1_numbers:
             for num2 in engine2_numbers:
-                if abs(float(num1) - float(num2)) < 0.1:
+                if abs(num1 - num2) < 0.1:
                     return True
         
         # Check for similar keywords
-        engine1_words = set(self._normalize_string(engine1).split())
-        engine2_words = set(self._normalize_string(engine2).split())
-        
         overlap = len(engine1_words & engine2_words)
         return overlap >= 2 or overlap / len(engine1_words | engine2_words) > 0.5
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _engine_features(engine: str) -> Tuple[Tuple[float, ...], frozenset]:
+        """Numeric values (displacement, power, etc.) and normalized words of an engine specification"""
+        numbers = tuple(float(number) for number in _ENGINE_NUMBER_RE.findall(engine.lower()))
+        words = frozenset(CanonicalVehicleService._normalize_string(engine).split())
+        return numbers, words
+
     def _generate_canonical_title(self, canonical_data: CanonicalVehicleCreate) -> str:
         """Generate a standardized title for canonical vehicle"""
-        parts = []
-        
-        if canonical_data.brand:
-            parts.append(canonical_data.brand.title())
-        if canonical_data.model:
-            parts.append(canonical_data.model.title())
-        if canonical_data.year:
-            parts.append(canonical_data.year)
-        if canonical_data.edition:
-            parts.append(canonical_data.edition.title())
-        
-        return " ".join(parts)
+        return _canonical_title(canonical_data.brand, canonical_data.model, canonical_data.year, canonical_data.edition)
 
     def _extract_body_type(self, title: str) -> Optional[str]:
         """Extract body type from vehicle title"""
         if not title:
             return None
         
+        # Several body types may be mentioned; the first listed in _BODY_TYPES wins,
+        # so probe in priority order and stop at the first keyword found
         title_lower = title.lower()
-        body_types = {
-            'sedan': ['sedan', 'sedán'],
-            'hatchback': ['hatchback', 'hatch'],
-            'suv': ['suv', 'camioneta'],
-            'pickup': ['pickup', 'pick up', 'pick-up'],
-            'coupe': ['coupe', 'coupé'],
-            'convertible': ['convertible', 'cabrio'],
-            'wagon': ['wagon', 'familiar'],
-            'van': ['van', 'furgon', 'furgón']
-        }
-        
-        for body_type, keywords in body_types.items():
-            for keyword in keywords:
-                if keyword in title_lower:
-                    return body_type
-        
+        for body_type, keywords in _BODY_TYPES.items():
+            if any(keyword in title_lower for keyword in keywords):
+                return body_type
         return None
 
     def _extract_specifications(self, vehicle_data: VehicleCreate) -> Dict[str, Any]:
@@ -299,47 +419,45 @@ class CanonicalVehicleService:
     async def update_canonical_vehicle_stats(self, canonical_id: str):
         """Update statistics for a canonical vehicle based on its listings"""
         try:
-            # Get all active listings for this canonical vehicle
-            listings = await self.vehicles_collection.find({
-                "canonical_vehicle_id": canonical_id,
-                "status": "active"
-            }).to_list(length=None)
-            
-            if not listings:
+            # Reduce the active listings server-side; prices are collected for the median
+            pipeline = [
+                {"$match": {"canonical_vehicle_id": canonical_id, "status": "active"}},
+                {"$group": {
+                    "_id": None,
+                    "listings": {"$sum": 1},
+                    "total_views": {"$sum": "$views_count"},
+                    "average_kilometers": {"$avg": "$kilometers_numeric"},
+                    "prices": {"$push": "$price_numeric"}
+                }}
+            ]
+            results = await (await self.vehicles_collection.aggregate(pipeline)).to_list(length=1)
+            
+            if not results:
                 return
             
-            # Calculate statistics
-            prices = [listing["price_numeric"] for listing in listings if listing.get("price_numeric")]
-            total_views = sum(listing.get("views_count", 0) for listing in listings)
-            
-            # Calculate kilometers average
-            kilometers_values = []
-            for listing in listings:
-                km_str = listing.get("kilometers", "")
-                if km_str:
-                    # Extract numeric value from kilometers string
-                    km_match = re.search(r'(\d+)', km_str.replace(",", "").replace(".", ""))
-                    if km_match:
-                        kilometers_values.append(int(km_match.group(1)))
+            stats = results[0]
+            prices = np.fromiter((price for price in stats["prices"] if price), dtype=np.float64)
             
             update_data = {
-                "total_listings": len(listings),
-                "active_listings": len(listings),
-                "total_views": total_views,
+                "total_listings": stats["listings"],
+                "active_listings": stats["listings"],
+                "total_views": stats["total_views"],
                 "updated_at": datetime.utcnow(),
                 "last_market_update": datetime.utcnow()
             }
             
-            if prices:
+            if prices.size:
+                # Upper median, selected without fully sorting the prices
+                middle = prices.size // 2
                 update_data.update({
-                    "min_price": min(prices),
-                    "max_price": max(prices),
-                    "avg_price": sum(prices) / len(prices),
-                    "median_price": sorted(prices)[len(prices) // 2]
+                    "min_price": float(prices.min()),
+                    "max_price": float(prices.max()),
+                    "avg_price": float(prices.mean()),
+                    "median_price": float(np.partition(prices, middle)[middle])
                 })
             
-            if kilometers_values:
-                update_data["average_kilometers"] = sum(kilometers_values) / len(kilometers_values)
+            if stats.get("average_kilometers") is not None:
+                update_data["average_kilometers"] = stats["average_kilometers"]
             
             await self.canonical_vehicles_collection.update_one(
                 {"_id": ObjectId(canonical_id)},
@@ -434,12 +552,23 @@ class CanonicalVehicleService:
     async def merge_canonical_vehicles(self, source_id: str, target_id: str) -> bool:
         """Merge two canonical vehicles (move all listings from source to target)"""
         try:
+            from services.vehicle_service import vehicle_cache
+            
+            moved_listings = await self.vehicles_collection.find(
+                {"canonical_vehicle_id": source_id},
+                {"_id": 1, "mercadolibre_id": 1}
+            ).to_list(length=None)
+            
             # Update all listings to point to target canonical vehicle
             result = await self.vehicles_collection.update_many(
                 {"canonical_vehicle_id": source_id},
                 {"$set": {"canonical_vehicle_id": target_id}}
             )
             
+            # Cached copies of the moved listings still point at the source canonical
+            for listing in moved_listings:
+                vehicle_cache.invalidate(listing["_id"], listing.get("mercadolibre_id"))
+            
             # Mark source canonical as merged
             await self.canonical_vehicles_collection.update_one(
                 {"_id": ObjectId(source_id)},
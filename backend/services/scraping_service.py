@@ -1,9 +1,17 @@
 import asyncio
 import aiohttp
+from collections import deque
+from contextlib import aclosing
+from functools import lru_cache
 import random
 import re
+import time
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional, Tuple, Any
+import soupsieve as sv
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+from typing import List, Dict, Optional, Tuple, Any, AsyncIterator
+from pydantic import TypeAdapter, ValidationError
 from datetime import datetime
 import logging
 from urllib.parse import urljoin, urlparse, parse_qs
@@ -17,6 +25,117 @@ from services.ml_extraction_service import ml_extractor
 
 logger = logging.getLogger(__name__)
 
+# Precompiled CSS selectors for single listing pages (compiled once instead of per call)
+_LOCATION_SELECTORS = [sv.compile(selector) for selector in [
+    "p.ui-pdp-color--GRAY.ui-pdp-size--XSMALL.ui-pdp-family--REGULAR",
+    ".ui-pdp-color--GRAY",
+    ".item-location",
+    "[data-testid*='location']"
+]]
+
+_IMAGE_SELECTORS = [sv.compile(selector) for selector in [
+    "img.ui-pdp-image.ui-pdp-gallery__figure__image",
+    ".ui-pdp-gallery img",
+    ".gallery img",
+    "img[src*='mlstatic']",
+    ".carousel img"
+]]
+
+# Precompiled (CSS -> XPath) selectors for listings pages, evaluated on the lxml tree
+_LISTING_ITEM_SELECTORS = [CSSSelector(selector, translator="html") for selector in [
+    "li.ui-search-layout__item",
+    "div.ui-search-result",
+    ".search-results .ui-search-result",
+    "li[class*='search-result']",
+    "li[class*='ui-search']",
+    ".results-item",
+    ".poly-card"
+]]
+
+_LISTING_TITLE_SELECTORS = [CSSSelector(selector, translator="html") for selector in [
+    "a.poly-component__title",
+    "h2.poly-box a",
+    ".ui-search-item__title a",
+    "a[title]",
+    ".ui-search-item__group__element h2 a",
+    ".ui-search-link"
+]]
+
+_LISTING_PRICE_SELECTORS = [CSSSelector(selector, translator="html") for selector in [
+    "span.andes-money-amount__fraction",
+    ".price-tag .price",
+    ".ui-search-price__part span.andes-money-amount__fraction",
+    ".price .andes-money-amount__fraction"
+]]
+
+_LISTING_ATTRS_SELECTORS = [CSSSelector(selector, translator="html") for selector in [
+    "ul.poly-attributes_list li",
+    ".ui-search-item__group--attributes li",
+    ".item-attributes li"
+]]
+
+_LISTING_LOCATION_SELECTORS = [CSSSelector(selector, translator="html") for selector in [
+    "span.poly-component__location",
+    ".ui-search-item__group--location span",
+    ".item-location"
+]]
+
+_LISTING_IMAGE_SELECTOR = CSSSelector("img", translator="html")
+
+# Image attributes that may hold the real (non-lazy-placeholder) URL, in priority order
+_IMAGE_URL_ATTRS = ("src", "data-src", "data-lazy", "data-original")
+_HTTP_PREFIXES = ("http://", "https://")
+
+# Deletes every Latin-1 character except ASCII digits: "$ 23.700.000" -> "23700000"
+_NON_DIGIT_TABLE = str.maketrans('', '', ''.join(chr(c) for c in range(256) if not 48 <= c <= 57))
+
+def _price_digits(price_text: str) -> str:
+    """Keep only the ASCII digits of a price string"""
+    digits = price_text.translate(_NON_DIGIT_TABLE)
+    if digits.isascii():
+        return digits
+    # Characters outside Latin-1 (e.g. narrow no-break spaces) are not in the table
+    return "".join(c for c in digits if "0" <= c <= "9")
+
+@lru_cache(maxsize=4096)
+def _extract_vehicle_info(title: str) -> Dict[str, Optional[str]]:
+    """ML brand/model/edition extraction, cached by title since titles repeat across pages.
+    The returned dict is shared between callers and must not be mutated."""
+    return ml_extractor.extract_vehicle_info(title)
+
+# Validates a whole page of listing dicts in one call into pydantic-core
+_VEHICLE_LIST_ADAPTER = TypeAdapter(List[VehicleCreate])
+
+# Minimum seconds between scraping job progress writes to MongoDB (websocket updates stay realtime)
+_PROGRESS_FLUSH_INTERVAL = 2.0
+
+# MercadoLibre listing ID in a URL, e.g. MCO-XXXXXXX-description
+_MERCADOLIBRE_ID_RE = re.compile(r'MCO-(\d+)')
+
+# Test/honeypot indicators, matched case-insensitively
+_TEST_VEHICLE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'test',           # "test" in any case
+    r'MCO-TEST',       # MercadoLibre test IDs
+    r'test\.com',      # test.com domain
+    r'honeypot',       # explicit honeypot mentions
+    r'dummy',          # dummy data
+    r'fake',           # fake data
+]]
+
+# Search results embedded as JSON arrays in the listings page
+_LISTINGS_JSON_PATTERNS = [re.compile(pattern, re.DOTALL) for pattern in [
+    r'"results":\s*(\[.*?\])',
+    r'"items":\s*(\[.*?\])',
+    r'"listingItems":\s*(\[.*?\])'
+]]
+
+# Specifications section containers, in priority order
+_SPECS_SECTION_SELECTORS = [sv.compile(selector) for selector in [
+    "section[data-testid=specifications]",
+    "div.ui-pdp-specs",
+    "div.specifications"
+]]
+
 class MercadoLibreScraper:
     """MercadoLibre scraping service"""
     
@@ -25,53 +144,56 @@ class MercadoLibreScraper:
         self.items_per_page = settings.MERCADOLIBRE_ITEMS_PER_PAGE
         self.websocket_manager = websocket_manager
         self.session: Optional[aiohttp.ClientSession] = None
+        # Index of the selector that last matched, per listings selector group
+        self._selector_cache: Dict[str, int] = {}
+        # Field selectors specialized to the winning listing item selector, keyed by (item css, field css)
+        self._scoped_selectors: Dict[Tuple[str, str], CSSSelector] = {}
 
-    def _is_test_vehicle(self, vehicle_data: Dict[str, Any]) -> bool:
+    def _is_test_vehicle(self, title: str, mercadolibre_id: str, url: str, image_url: str) -> bool:
         """
         Detect test/honeypot vehicles to avoid storing them in the database.
         These are typically used to catch bots and should be filtered out.
         """
-        test_patterns = [
-            r'test',           # "test" in any case
-            r'MCO-TEST',       # MercadoLibre test IDs
-            r'test\.com',      # test.com domain
-            r'honeypot',       # explicit honeypot mentions
-            r'dummy',          # dummy data
-            r'fake',           # fake data
-        ]
-        
-        # Compile patterns for case-insensitive matching
-        compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in test_patterns]
-        
         # Check various fields for test indicators
-        fields_to_check = [
-            vehicle_data.get('mercadolibre_id', ''),
-            vehicle_data.get('url', ''),
-            vehicle_data.get('image_url', ''),
-            vehicle_data.get('title', ''),
-        ]
-        
-        for field_value in fields_to_check:
+        for field_value in (mercadolibre_id, url, image_url, title):
             if field_value and isinstance(field_value, str):
-                for pattern in compiled_patterns:
+                for pattern in _TEST_VEHICLE_PATTERNS:
                     if pattern.search(field_value):
-                        logger.info(f"🚫 Test vehicle detected: {vehicle_data.get('title', 'Unknown')} - Pattern: {pattern.pattern}")
+                        logger.info(f"🚫 Test vehicle detected: {title or 'Unknown'} - Pattern: {pattern.pattern}")
                         return True
         
         return False
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=settings.SCRAPING_TIMEOUT),
-            connector=aiohttp.TCPConnector(limit=settings.SCRAPING_CONCURRENT_REQUESTS)
-        )
+        await self._get_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
+        await self.aclose()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use"""
+        if self.session is None or self.session.closed:
+            # One session per job so keep-alive connections, DNS lookups and TLS
+            # sessions to the MercadoLibre hosts are reused across page fetches
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=settings.SCRAPING_TIMEOUT),
+                connector=aiohttp.TCPConnector(
+                    limit=settings.SCRAPING_CONCURRENT_REQUESTS,
+                    limit_per_host=settings.SCRAPING_CONCURRENT_REQUESTS,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=75
+                )
+            )
+        return self.session
+
+    async def aclose(self):
+        """Close the shared HTTP session"""
+        if self.session and not self.session.closed:
             await self.session.close()
+        self.session = None
 
     def _get_headers(self) -> Dict[str, str]:
         """Get randomized headers for scraping"""
@@ -96,42 +218,49 @@ class MercadoLibreScraper:
                 if settings.DEBUG_SCRAPING:
                     logger.info(f"🔍 DEBUG: Using headers: {json.dumps(headers, indent=2)}")
                 
-                async with self.session.get(url, headers=headers) as response:
+                session = await self._get_session()
+                async with session.get(url, headers=headers) as response:
                     if settings.DEBUG_SCRAPING:
                         logger.info(f"🔍 DEBUG: Response status: {response.status}")
                         logger.info(f"🔍 DEBUG: Response headers: {dict(response.headers)}")
                         
                     if response.status == 200:
-                        html_content = await response.text()
+                        # Keep the raw body; decoding to str is left to callers that need it
+                        body = await response.read()
+                        encoding = response.get_encoding()
                         
                         if settings.DEBUG_SCRAPING:
-                            logger.info(f"🔍 DEBUG: Response content length: {len(html_content)} characters")
-                            logger.info(f"🔍 DEBUG: First 500 chars: {html_content[:500]}")
+                            logger.info(f"🔍 DEBUG: Response content length: {len(body)} bytes")
+                            logger.info(f"🔍 DEBUG: First 500 chars: {body[:500].decode(encoding, errors='replace')}")
                             
                         if settings.DEBUG_SAVE_HTML:
                             # Save HTML to debug file
                             debug_filename = f"debug_response_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
                             try:
-                                with open(debug_filename, 'w', encoding='utf-8') as f:
-                                    f.write(html_content)
+                                with open(debug_filename, 'wb') as f:
+                                    f.write(body)
                                 logger.info(f"🔍 DEBUG: Saved HTML response to {debug_filename}")
                             except Exception as e:
                                 logger.error(f"🔍 DEBUG: Failed to save HTML: {e}")
                         
                         if settings.DEBUG_PRINT_RESPONSE:
-                            logger.info(f"🔍 DEBUG: Full response content:\n{html_content}")
+                            logger.info(f"🔍 DEBUG: Full response content:\n{body.decode(encoding, errors='replace')}")
                             
                         # Create a new response object with the content
                         class DebugResponse:
-                            def __init__(self, status, headers, content):
+                            def __init__(self, status, headers, body, encoding):
                                 self.status = status
                                 self.headers = headers
-                                self._content = content
+                                self.encoding = encoding
+                                self._body = body
+                            
+                            async def read(self):
+                                return self._body
                             
                             async def text(self):
-                                return self._content
+                                return self._body.decode(self.encoding, errors='replace')
                                 
-                        return DebugResponse(response.status, response.headers, html_content)
+                        return DebugResponse(response.status, response.headers, body, encoding)
                         
                     elif response.status == 429:  # Rate limited
                         wait_time = random.uniform(5, 15)
@@ -150,11 +279,7 @@ class MercadoLibreScraper:
                 if settings.DEBUG_SCRAPING:
                     logger.info(f"🔍 DEBUG: ClientError details: {type(e).__name__}: {str(e)}")
             except Exception as e:
-                logger.error(f"❌ Request failed (attempt {attempt + 1}): {e}")
-                if settings.DEBUG_SCRAPING:
-                    logger.info(f"🔍 DEBUG: Exception details: {type(e).__name__}: {str(e)}")
-                    import traceback
-                    logger.info(f"🔍 DEBUG: Traceback: {traceback.format_exc()}")
+                logger.error(f"❌ Request failed (attempt {attempt + 1}): {e}", exc_info=settings.DEBUG_SCRAPING)
                     
             if attempt < retries - 1:
                 retry_wait = random.uniform(2, 5)
@@ -168,7 +293,7 @@ class MercadoLibreScraper:
     def _extract_mercadolibre_id(self, url: str) -> str:
         """Extract MercadoLibre ID from URL"""
         # Pattern: MCO-XXXXXXX-description
-        match = re.search(r'MCO-(\d+)', url)
+        match = _MERCADOLIBRE_ID_RE.search(url)
         if match:
             return f"MCO-{match.group(1)}"
         
@@ -181,19 +306,30 @@ class MercadoLibreScraper:
                 
         return url  # Fallback to full URL
 
+    def _detect_captcha(self, html_bytes: bytes) -> Optional[bool]:
+        """
+        Cheap CAPTCHA check on the <title> found in the first 4KB of the raw response bytes.
+        Returns None when the title is not there and the parsed page must be checked.
+        """
+        head = html_bytes[:4096].lower()
+        title_start = head.find(b"<title")
+        if title_start == -1:
+            return None
+        title_end = head.find(b"</title>", title_start)
+        if title_end == -1:
+            return None
+        return b"robot" in head[title_start:title_end]
+
     def _parse_price(self, price_text: str) -> Tuple[str, Optional[float]]:
         """Parse price text and extract numeric value"""
         if not price_text:
             return "No price", None
             
-        # Remove currency symbols, dots, and spaces
-        numeric_price = re.sub(r'[^\d,]', '', price_text)
-        numeric_price = numeric_price.replace(',', '.')
-        
-        try:
-            return price_text.strip(), float(numeric_price)
-        except (ValueError, AttributeError):
+        # Colombian peso format uses dots as thousand separators, so keep only the digits
+        price_digits = _price_digits(price_text)
+        if not price_digits:
             return price_text.strip(), None
+        return price_text.strip(), float(price_digits)
 
     def _extract_vehicle_details(self, soup: BeautifulSoup) -> Dict[str, Any]:
         """Extract detailed vehicle information from single listing page"""
@@ -293,10 +429,7 @@ class MercadoLibreScraper:
             return data
             
         except Exception as e:
-            logger.error(f"❌ Error extracting JSON data: {e}")
-            if settings.DEBUG_SCRAPING:
-                import traceback
-                logger.info(f"🔍 DEBUG: JSON extraction traceback: {traceback.format_exc()}")
+            logger.error(f"❌ Error extracting JSON data: {e}", exc_info=settings.DEBUG_SCRAPING)
             return None
 
     def _extract_vehicle_from_json(self, data: dict, url: str) -> Optional[VehicleCreate]:
@@ -368,7 +501,8 @@ class MercadoLibreScraper:
             
             # Extract brand and model from title
             if title and title != "No title":
-                title_parts = title.split()
+                # Only the first two words are needed, so avoid splitting the whole title
+                title_parts = title.split(None, 2)
                 if len(title_parts) >= 2:
                     brand = title_parts[0]
                     model = title_parts[1]
@@ -377,14 +511,7 @@ class MercadoLibreScraper:
             mercadolibre_id = self._extract_mercadolibre_id(url)
             
             # Check if this is a test vehicle before creating
-            vehicle_dict = {
-                'title': title,
-                'mercadolibre_id': mercadolibre_id,
-                'url': url,
-                'image_url': image_url
-            }
-            
-            if self._is_test_vehicle(vehicle_dict):
+            if self._is_test_vehicle(title, mercadolibre_id, url, image_url):
                 logger.info(f"🚫 Skipping test vehicle: {title}")
                 return None
             
@@ -412,10 +539,7 @@ class MercadoLibreScraper:
             return vehicle_data
             
         except Exception as e:
-            logger.error(f"❌ Error extracting vehicle from JSON: {e}")
-            if settings.DEBUG_SCRAPING:
-                import traceback
-                logger.info(f"🔍 DEBUG: JSON vehicle extraction traceback: {traceback.format_exc()}")
+            logger.error(f"❌ Error extracting vehicle from JSON: {e}", exc_info=settings.DEBUG_SCRAPING)
             return None
 
     async def scrape_single_vehicle(self, url: str) -> Optional[VehicleCreate]:
@@ -429,17 +553,27 @@ class MercadoLibreScraper:
                 logger.error(f"❌ No response received for {url}")
                 return None
 
-            html_content = await response.text()
+            html_bytes = await response.read()
             if settings.DEBUG_SCRAPING:
-                logger.info(f"🔍 DEBUG: Received HTML content, length: {len(html_content)}")
+                logger.info(f"🔍 DEBUG: Received HTML content, length: {len(html_bytes)} bytes")
                 
-            soup = BeautifulSoup(html_content, "html.parser")
-            
-            # Check for CAPTCHA or blocking (same as working script)
-            if soup.find("title") and "robot" in soup.find("title").text.lower():
+            # Check for CAPTCHA or blocking on the raw bytes before decoding and parsing
+            captcha_detected = self._detect_captcha(html_bytes)
+            if captcha_detected:
                 logger.warning("🤖 Blocked by MercadoLibre: CAPTCHA detected")
                 return None
 
+            html_content = html_bytes.decode(response.encoding, errors="replace")
+
+            soup = BeautifulSoup(html_content, "lxml")
+            
+            # Fall back to the parsed title when the raw check was inconclusive
+            if captcha_detected is None:
+                title_tag = soup.find("title")
+                if title_tag and "robot" in title_tag.text.lower():
+                    logger.warning("🤖 Blocked by MercadoLibre: CAPTCHA detected")
+                    return None
+
             # Extract title using the exact same approach as working script
             title_elem = soup.find("h1", class_="ui-pdp-title")
             title = title_elem.text.strip() if title_elem else "Not found"
@@ -455,32 +589,21 @@ class MercadoLibreScraper:
             # Parse price numeric value (Colombian peso format)
             price_numeric = None
             if price_text and price_text != "Not found":
-                try:
-                    # Colombian peso format: "23.700.000" (dots as thousand separators)
-                    # Remove any non-numeric characters except dots
-                    numeric_price = re.sub(r'[^\d.]', '', price_text)
-                    # Replace dots with empty string (Colombian format uses dots as thousand separators)
-                    numeric_price = numeric_price.replace('.', '')
-                    price_numeric = float(numeric_price)
+                # Colombian peso format: "23.700.000" (dots as thousand separators),
+                # so the numeric value is just its digits
+                price_digits = _price_digits(price_text)
+                if price_digits:
+                    price_numeric = float(price_digits)
                     if settings.DEBUG_SCRAPING:
                         logger.info(f"🔍 DEBUG: Parsed price '{price_text}' -> {price_numeric}")
-                except (ValueError, AttributeError) as e:
-                    if settings.DEBUG_SCRAPING:
-                        logger.info(f"🔍 DEBUG: Failed to parse price '{price_text}': {e}")
-                    price_numeric = None
+                elif settings.DEBUG_SCRAPING:
+                    logger.info(f"🔍 DEBUG: Failed to parse price '{price_text}': no digits found")
 
             # Extract location (try multiple approaches)
             location = "Not found"
             # Try the common location selectors
-            location_selectors = [
-                "p.ui-pdp-color--GRAY.ui-pdp-size--XSMALL.ui-pdp-family--REGULAR",
-                ".ui-pdp-color--GRAY",
-                ".item-location",
-                "[data-testid*='location']"
-            ]
-            
-            for selector in location_selectors:
-                location_elem = soup.select_one(selector)
+            for selector in _LOCATION_SELECTORS:
+                location_elem = selector.select_one(soup)
                 if location_elem and location_elem.text.strip():
                     location = location_elem.text.strip()
                     break
@@ -491,16 +614,8 @@ class MercadoLibreScraper:
             # Extract main image
             image_url = "Not found"
             # Try multiple image selectors
-            image_selectors = [
-                "img.ui-pdp-image.ui-pdp-gallery__figure__image",
-                ".ui-pdp-gallery img",
-                ".gallery img",
-                "img[src*='mlstatic']",
-                ".carousel img"
-            ]
-            
-            for selector in image_selectors:
-                img_elem = soup.select_one(selector)
+            for selector in _IMAGE_SELECTORS:
+                img_elem = selector.select_one(soup)
                 if img_elem and img_elem.get("src"):
                     image_url = img_elem["src"]
                     break
@@ -522,17 +637,13 @@ class MercadoLibreScraper:
             fuel_type = "Not found"
             doors = None
             
-            # Try to extract specifications from various sections
-            specs_sections = [
-                soup.find("section", {"data-testid": "specifications"}),
-                soup.find("div", class_="ui-pdp-specs"),
-                soup.find("div", class_="specifications")
-            ]
-            
-            for specs_section in specs_sections:
-                if not specs_section:
-                    continue
-                    
+            # Find the specifications section, preferring the current page layout
+            specs_section = None
+            for selector in _SPECS_SECTION_SELECTORS:
+                specs_section = selector.select_one(soup)
+                if specs_section:
+                    break
+            if specs_section:
                 # Look for spec items
                 spec_items = specs_section.find_all("div", class_="ui-pdp-specs__item")
                 for item in spec_items:
@@ -564,32 +675,21 @@ class MercadoLibreScraper:
                                 doors = int(value)
                             except ValueError:
                                 doors = value
-                break  # Use first valid specs section
-            
-            # Try to extract brand/model/edition from title using ML if not found in specs
-            if brand == "Not found" or model == "Not found":
-                ml_info = ml_extractor.extract_vehicle_info(title)
-                if brand == "Not found":
-                    brand = ml_info.get('brand', 'Not found')
-                if model == "Not found":
-                    model = ml_info.get('model', 'Not found')
             
-            # Always extract edition using ML (not available from specs usually)
-            ml_info = ml_extractor.extract_vehicle_info(title)
+            # Extract brand/model/edition from title using ML once; edition is always needed
+            # (not available from specs usually) and brand/model fall back to it
+            ml_info = _extract_vehicle_info(title)
+            if brand == "Not found":
+                brand = ml_info.get('brand', 'Not found')
+            if model == "Not found":
+                model = ml_info.get('model', 'Not found')
             edition = ml_info.get('edition', 'Not found')
 
             if settings.DEBUG_SCRAPING:
                 logger.info(f"🔍 DEBUG: Extracted specs - Year: {year}, Kilometers: {kilometers}, Brand: {brand}, Model: {model}, Edition: {edition}")
 
             # Check if this is a test vehicle before creating
-            vehicle_dict = {
-                'title': title,
-                'mercadolibre_id': mercadolibre_id,
-                'url': url,
-                'image_url': image_url
-            }
-            
-            if self._is_test_vehicle(vehicle_dict):
+            if self._is_test_vehicle(title, mercadolibre_id, url, image_url):
                 logger.info(f"🚫 Skipping test vehicle: {title}")
                 return None
 
@@ -623,10 +723,7 @@ class MercadoLibreScraper:
             return vehicle_data
 
         except Exception as e:
-            logger.error(f"❌ Error scraping single vehicle {url}: {e}")
-            if settings.DEBUG_SCRAPING:
-                import traceback
-                logger.info(f"🔍 DEBUG: Full traceback: {traceback.format_exc()}")
+            logger.error(f"❌ Error scraping single vehicle {url}: {e}", exc_info=settings.DEBUG_SCRAPING)
             return None
 
     def _extract_listings_from_json(self, html_content: str) -> List[dict]:
@@ -636,21 +733,15 @@ class MercadoLibreScraper:
             listings = []
             
             # Try to find results in window.__NEXT_DATA__ or similar structures
-            json_patterns = [
-                r'"results":\s*(\[.*?\])',
-                r'"items":\s*(\[.*?\])',
-                r'"listingItems":\s*(\[.*?\])'
-            ]
-            
-            for pattern in json_patterns:
-                matches = re.findall(pattern, html_content, re.DOTALL)
+            for pattern in _LISTINGS_JSON_PATTERNS:
+                matches = pattern.findall(html_content)
                 for match in matches:
                     try:
                         items = json.loads(match)
                         if isinstance(items, list) and items:
                             listings.extend(items)
                             if settings.DEBUG_SCRAPING:
-                                logger.info(f"🔍 DEBUG: Found {len(items)} listings using pattern: {pattern}")
+                                logger.info(f"🔍 DEBUG: Found {len(items)} listings using pattern: {pattern.pattern}")
                     except json.JSONDecodeError:
                         continue
             
@@ -660,12 +751,73 @@ class MercadoLibreScraper:
             logger.error(f"❌ Error extracting listings from JSON: {e}")
             return []
 
+    def _first_match(self, element, group_key: str, selectors: List[CSSSelector], min_matches: int = 1) -> list:
+        """
+        Return the matches of the first selector in the group that finds at least
+        min_matches elements, trying the selector that worked last time first
+        """
+        cached_index = self._selector_cache.get(group_key)
+        if cached_index is not None:
+            matches = selectors[cached_index](element)
+            if len(matches) >= min_matches:
+                return matches
+
+        for index, selector in enumerate(selectors):
+            if index == cached_index:
+                continue
+            matches = selector(element)
+            if len(matches) >= min_matches:
+                self._selector_cache[group_key] = index
+                return matches
+
+        return []
+
+    def _scoped_selector(self, scope: CSSSelector, selector: CSSSelector) -> CSSSelector:
+        """Compile (once) a field selector that only matches inside elements matched by scope"""
+        key = (scope.css, selector.css)
+        scoped = self._scoped_selectors.get(key)
+        if scoped is None:
+            scoped = CSSSelector(f"{scope.css} {selector.css}", translator="html")
+            self._scoped_selectors[key] = scoped
+        return scoped
+
+    def _match_items(self, tree, items: list, scope: CSSSelector, selectors: List[CSSSelector], min_matches: int = 1) -> Dict[Any, list]:
+        """
+        Run a selector group over the whole page and return, for each listing item,
+        the matches of the first selector (in priority order) that finds at least
+        min_matches elements inside it. Later selectors only run while some items
+        are still unmatched. Selectors are specialized to the item selector (scope)
+        so nodes outside listings are never matched.
+        """
+        item_set = set(items)
+        results: Dict[Any, list] = {}
+
+        for selector in selectors:
+            # Group this selector's page-wide matches by their enclosing listing item
+            grouped: Dict[Any, list] = {}
+            for node in self._scoped_selector(scope, selector)(tree):
+                for ancestor in node.iterancestors():
+                    if ancestor in item_set:
+                        grouped.setdefault(ancestor, []).append(node)
+                        break
+
+            for item, matches in grouped.items():
+                if item not in results and len(matches) >= min_matches:
+                    results[item] = matches
+
+            if len(results) == len(item_set):
+                break
+
+        return results
+
     async def scrape_listings_page(self, page_url: str) -> List[VehicleCreate]:
         """Scrape vehicle listings from a single page using reliable HTML parsing"""
         vehicles = []
+        # Read the setting once; it is checked for every listing item below
+        debug = settings.DEBUG_SCRAPING
         
         try:
-            if settings.DEBUG_SCRAPING:
+            if debug:
                 logger.info(f"🔍 DEBUG: Starting bulk scraping for page {page_url}")
                 
             response = await self._stealth_get(page_url)
@@ -673,58 +825,61 @@ class MercadoLibreScraper:
                 logger.error(f"❌ No response received for {page_url}")
                 return vehicles
 
-            html_content = await response.text()
-            if settings.DEBUG_SCRAPING:
-                logger.info(f"🔍 DEBUG: Received HTML content, length: {len(html_content)}")
+            # Hand the raw bytes straight to lxml, which decodes while parsing
+            html_bytes = await response.read()
+            if debug:
+                logger.info(f"🔍 DEBUG: Received HTML content, length: {len(html_bytes)} bytes")
                 
-            soup = BeautifulSoup(html_content, "html.parser")
+            # Check for CAPTCHA or blocking on the raw HTML before building the tree
+            captcha_detected = self._detect_captcha(html_bytes)
+            if captcha_detected:
+                logger.warning("🤖 Blocked by MercadoLibre: CAPTCHA detected")
+                return vehicles
+
+            # Parse with lxml's C parser; listing selectors are precompiled to XPath
+            parser = lxml_html.HTMLParser(encoding=response.encoding)
+            tree = lxml_html.fromstring(html_bytes, parser=parser)
             
-            # Check for CAPTCHA or blocking (same as working script)
-            if soup.find("title") and "robot" in soup.find("title").text.lower():
+            # Fall back to the parsed title when the raw check was inconclusive
+            page_title = tree.findtext(".//title")
+            if captcha_detected is None and page_title and "robot" in page_title.lower():
                 logger.warning("🤖 Blocked by MercadoLibre: CAPTCHA detected")
                 return vehicles
 
-            if settings.DEBUG_SCRAPING:
-                page_title = soup.find("title")
-                logger.info(f"🔍 DEBUG: Page title: {page_title.text if page_title else 'No title'}")
+            if debug:
+                logger.info(f"🔍 DEBUG: Page title: {page_title if page_title else 'No title'}")
 
             # Find listing items using multiple selector strategies
-            items = []
-            
-            # Try different selectors for listing items
-            selectors_to_try = [
-                "li.ui-search-layout__item",
-                "div.ui-search-result",
-                ".search-results .ui-search-result", 
-                "li[class*='search-result']",
-                "li[class*='ui-search']",
-                ".results-item",
-                ".poly-card"
-            ]
-            
-            for selector in selectors_to_try:
-                items = soup.select(selector)
-                if items:
-                    if settings.DEBUG_SCRAPING:
-                        logger.info(f"🔍 DEBUG: Found {len(items)} items using selector: {selector}")
-                    break
+            items = self._first_match(tree, "items", _LISTING_ITEM_SELECTORS)
+            if items and debug:
+                selector = _LISTING_ITEM_SELECTORS[self._selector_cache["items"]]
+                logger.info(f"🔍 DEBUG: Found {len(items)} items using selector: {selector.css}")
             
             if not items:
                 logger.warning("⚠️  No listings found - page structure may have changed")
-                if settings.DEBUG_SCRAPING:
+                if debug:
                     logger.info("🔍 DEBUG: Available li classes (first 10):")
-                    all_lis = soup.find_all("li")[:10]
+                    all_lis = tree.findall(".//li")[:10]
                     for i, li in enumerate(all_lis):
-                        classes = li.get('class', [])
+                        classes = (li.get('class') or '').split()
                         logger.info(f"  li[{i}]: {classes}")
                 return vehicles
 
-            if settings.DEBUG_SCRAPING:
+            if debug:
                 logger.info(f"🔍 DEBUG: Processing {len(items)} listing items")
 
+            # Evaluate each field's selectors once over the whole page, scoped to the winning item selector
+            item_selector = _LISTING_ITEM_SELECTORS[self._selector_cache["items"]]
+            title_matches = self._match_items(tree, items, item_selector, _LISTING_TITLE_SELECTORS)
+            price_matches = self._match_items(tree, items, item_selector, _LISTING_PRICE_SELECTORS)
+            attrs_matches = self._match_items(tree, items, item_selector, _LISTING_ATTRS_SELECTORS, min_matches=2)
+            location_matches = self._match_items(tree, items, item_selector, _LISTING_LOCATION_SELECTORS)
+            image_matches = self._match_items(tree, items, item_selector, [_LISTING_IMAGE_SELECTOR])
+
+            vehicles_raw = []
             for i, item in enumerate(items):
                 try:
-                    if settings.DEBUG_SCRAPING and i < 3:  # Debug first 3 items
+                    if debug and i < 3:  # Debug first 3 items
                         logger.info(f"🔍 DEBUG: Processing item {i+1}")
                     
                     # Extract title and URL - try multiple approaches
@@ -732,94 +887,52 @@ class MercadoLibreScraper:
                     vehicle_url = ""
                     
                     # Try different title selectors
-                    title_selectors = [
-                        "a.poly-component__title",
-                        "h2.poly-box a",
-                        ".ui-search-item__title a", 
-                        "a[title]",
-                        ".ui-search-item__group__element h2 a",
-                        ".ui-search-link"
-                    ]
-                    
-                    for selector in title_selectors:
-                        title_elem = item.select_one(selector)
-                        if title_elem:
-                            title = title_elem.text.strip()
-                            vehicle_url = title_elem.get("href", "")
-                            if vehicle_url and not vehicle_url.startswith("http"):
-                                vehicle_url = "https://carro.mercadolibre.com.co" + vehicle_url
-                            break
+                    title_elems = title_matches.get(item)
+                    if title_elems:
+                        title_elem = title_elems[0]
+                        title = title_elem.text_content().strip()
+                        vehicle_url = title_elem.get("href", "")
+                        if vehicle_url and not vehicle_url.startswith("http"):
+                            vehicle_url = "https://carro.mercadolibre.com.co" + vehicle_url
                     
                     if not vehicle_url:
                         continue
                     
-                    if settings.DEBUG_SCRAPING and i < 3:
+                    if debug and i < 3:
                         logger.info(f"🔍 DEBUG: Item {i+1} - Title: {title[:50]}...")
                         logger.info(f"🔍 DEBUG: Item {i+1} - URL: {vehicle_url}")
 
                     # Extract price - try multiple approaches
                     price_text = "Not found"
-                    price_numeric = None
                     
-                    price_selectors = [
-                        "span.andes-money-amount__fraction",
-                        ".price-tag .price", 
-                        ".ui-search-price__part span.andes-money-amount__fraction",
-                        ".price .andes-money-amount__fraction"
-                    ]
-                    
-                    for selector in price_selectors:
-                        price_elem = item.select_one(selector)
-                        if price_elem:
-                            price_text = price_elem.text.strip()
-                            # Parse numeric value
-                            try:
-                                numeric_price = re.sub(r'[^\d,.]', '', price_text)
-                                numeric_price = numeric_price.replace(',', '')
-                                price_numeric = float(numeric_price)
-                            except (ValueError, AttributeError):
-                                price_numeric = None
-                            break
+                    price_elems = price_matches.get(item)
+                    if price_elems:
+                        price_text = price_elems[0].text_content().strip()
 
                     # Extract year and kilometers from attributes
                     year = "Not found"
                     kilometers = "Not found"
                     
-                    attrs_selectors = [
-                        "ul.poly-attributes_list li",
-                        ".ui-search-item__group--attributes li",
-                        ".item-attributes li"
-                    ]
-                    
-                    for selector in attrs_selectors:
-                        attrs = item.select(selector)
-                        if len(attrs) >= 2:
-                            year = attrs[0].text.strip()
-                            kilometers = attrs[1].text.strip()
-                            break
+                    attrs = attrs_matches.get(item)
+                    if attrs:
+                        year = attrs[0].text_content().strip()
+                        kilometers = attrs[1].text_content().strip()
 
                     # Extract location
                     location = "Not found"
-                    location_selectors = [
-                        "span.poly-component__location",
-                        ".ui-search-item__group--location span",
-                        ".item-location"
-                    ]
-                    
-                    for selector in location_selectors:
-                        location_elem = item.select_one(selector)
-                        if location_elem:
-                            location = location_elem.text.strip()
-                            break
+                    location_elems = location_matches.get(item)
+                    if location_elems:
+                        location = location_elems[0].text_content().strip()
 
                     # Extract image URL
                     image_url = "Not found"
-                    img_elem = item.select_one("img")
-                    if img_elem:
+                    img_elems = image_matches.get(item)
+                    if img_elems:
+                        img_attrs = img_elems[0].attrib
                         # Try various image URL attributes
-                        for attr in ["src", "data-src", "data-lazy", "data-original"]:
-                            img_url = img_elem.get(attr, "")
-                            if img_url and img_url.startswith("http"):
+                        for attr in _IMAGE_URL_ATTRS:
+                            img_url = img_attrs.get(attr)
+                            if img_url and img_url.startswith(_HTTP_PREFIXES):
                                 image_url = img_url
                                 break
 
@@ -827,83 +940,120 @@ class MercadoLibreScraper:
                     mercadolibre_id = self._extract_mercadolibre_id(vehicle_url)
 
                     # Extract brand, model, and edition using ML extractor
-                    ml_info = ml_extractor.extract_vehicle_info(title)
+                    ml_info = _extract_vehicle_info(title)
                     brand = ml_info.get('brand', 'Not found')
                     model = ml_info.get('model', 'Not found')
                     edition = ml_info.get('edition', 'Not found')
                     
-                    if settings.DEBUG_SCRAPING and i < 3:
+                    if debug and i < 3:
                         logger.info(f"🔍 DEBUG: Item {i+1} - ML extraction: Brand={brand}, Model={model}, Edition={edition}")
                     
                     # Apply price parsing (same fix as single vehicle)
                     price_numeric_fixed = None
                     if price_text and price_text != "Not found":
-                        try:
-                            # Colombian peso format: "23.700.000" (dots as thousand separators)
-                            numeric_price = re.sub(r'[^\d.]', '', price_text)
-                            numeric_price = numeric_price.replace('.', '')
-                            price_numeric_fixed = float(numeric_price)
-                            if settings.DEBUG_SCRAPING and i < 3:
+                        # Colombian peso format: "23.700.000" (dots as thousand separators)
+                        price_digits = _price_digits(price_text)
+                        if price_digits:
+                            price_numeric_fixed = float(price_digits)
+                            if debug and i < 3:
                                 logger.info(f"🔍 DEBUG: Item {i+1} - Parsed price '{price_text}' -> {price_numeric_fixed}")
-                        except (ValueError, AttributeError):
-                            price_numeric_fixed = None
 
                     # Check if this is a test vehicle before creating
-                    vehicle_dict = {
-                        'title': title,
-                        'mercadolibre_id': mercadolibre_id,
-                        'url': vehicle_url,
-                        'image_url': image_url
-                    }
-                    
-                    if self._is_test_vehicle(vehicle_dict):
+                    if self._is_test_vehicle(title, mercadolibre_id, vehicle_url, image_url):
                         logger.info(f"🚫 Skipping test vehicle in listings: {title}")
                         continue
 
-                    # Create vehicle object
-                    vehicle = VehicleCreate(
-                        title=title,
-                        price=price_text,
-                        price_numeric=price_numeric_fixed,
-                        mercadolibre_id=mercadolibre_id,
-                        url=vehicle_url,
-                        year=year,
-                        kilometers=kilometers,
-                        location=location,
-                        image_url=image_url,
-                        brand=brand,
-                        model=model,
-                        edition=edition
-                    )
-
-                    vehicles.append(vehicle)
+                    # Collect plain dicts; the whole page is validated into VehicleCreate below
+                    vehicles_raw.append({
+                        'title': title,
+                        'price': price_text,
+                        'price_numeric': price_numeric_fixed,
+                        'mercadolibre_id': mercadolibre_id,
+                        'url': vehicle_url,
+                        'year': year,
+                        'kilometers': kilometers,
+                        'location': location,
+                        'image_url': image_url,
+                        'brand': brand,
+                        'model': model,
+                        'edition': edition
+                    })
                     
-                    if settings.DEBUG_SCRAPING and i < 3:
+                    if debug and i < 3:
                         logger.info(f"🔍 DEBUG: Item {i+1} successfully parsed")
 
                 except Exception as e:
-                    logger.error(f"❌ Error parsing listing item {i+1}: {e}")
-                    if settings.DEBUG_SCRAPING:
-                        import traceback
-                        logger.info(f"🔍 DEBUG: Item parsing traceback: {traceback.format_exc()}")
+                    logger.error(f"❌ Error parsing listing item {i+1}: {e}", exc_info=debug)
                     continue
 
-            if settings.DEBUG_SCRAPING:
+            vehicles = self._validate_listings(vehicles_raw)
+
+            if debug:
                 logger.info(f"🔍 DEBUG: Successfully extracted {len(vehicles)} vehicles from listings page")
 
         except Exception as e:
-            logger.error(f"❌ Error scraping listings page {page_url}: {e}")
-            if settings.DEBUG_SCRAPING:
-                import traceback
-                logger.info(f"🔍 DEBUG: Full traceback: {traceback.format_exc()}")
+            logger.error(f"❌ Error scraping listings page {page_url}: {e}", exc_info=debug)
 
         return vehicles
 
+    def _validate_listings(self, vehicles_raw: List[Dict[str, Any]]) -> List[VehicleCreate]:
+        """Validate a page of listing dicts at once, falling back to per item so one bad listing doesn't drop the page"""
+        try:
+            return _VEHICLE_LIST_ADAPTER.validate_python(vehicles_raw)
+        except ValidationError:
+            vehicles = []
+            for raw in vehicles_raw:
+                try:
+                    vehicles.append(VehicleCreate.model_validate(raw))
+                except ValidationError as e:
+                    logger.error(f"❌ Error parsing listing item {raw.get('mercadolibre_id')}: {e}")
+            return vehicles
+
+    def _page_url(self, page: int) -> str:
+        """Build the listings URL for a 1-based page number"""
+        start = 1 + (page - 1) * self.items_per_page
+        if start == 1:
+            return self.base_url
+        return f"{self.base_url}/_Desde_{start}_NoIndex_True"
+
+    async def _iter_listing_pages(self, max_pages: Optional[int]) -> AsyncIterator[Tuple[int, str, List[VehicleCreate]]]:
+        """
+        Yield (page, url, vehicles) in page order while keeping up to
+        SCRAPING_CONCURRENT_REQUESTS page fetches in flight ahead of the page
+        being consumed, so the next page downloads while the caller saves this one.
+        Pages are requested until max_pages; callers stop iterating on the last page
+        and should wrap the iterator in aclosing() so pending fetches are cancelled.
+        """
+        window = max(1, settings.SCRAPING_CONCURRENT_REQUESTS)
+        pending = deque()
+        next_page = 1
+
+        def fill_window():
+            nonlocal next_page
+            while len(pending) < window and (not max_pages or next_page <= max_pages):
+                url = self._page_url(next_page)
+                pending.append((next_page, url, asyncio.create_task(self.scrape_listings_page(url))))
+                next_page += 1
+
+        try:
+            while True:
+                fill_window()
+                if not pending:
+                    return
+
+                page, url, task = pending.popleft()
+                # Refill before handing the page over so a fetch is always ahead of the consumer
+                fill_window()
+                yield page, url, await task
+        finally:
+            for _, _, task in pending:
+                task.cancel()
+            await asyncio.gather(*(task for _, _, task in pending), return_exceptions=True)
+
     async def scrape_all_listings(self, job_id: str, max_pages: Optional[int] = None) -> List[VehicleCreate]:
         """Scrape all vehicle listings from MercadoLibre"""
         all_vehicles = []
-        page = 1
-        start = 1
+        page = 0
 
         # Emit initial progress
         await self.websocket_manager.send_scraping_update(
@@ -913,46 +1063,31 @@ class MercadoLibreScraper:
             message="Starting to scrape listings..."
         )
 
-        while True:
-            if max_pages and page > max_pages:
-                break
-
-            # Construct URL
-            if start == 1:
-                url = self.base_url
-            else:
-                url = f"{self.base_url}/_Desde_{start}_NoIndex_True"
-
-            logger.info(f"Scraping page {page}: {url}")
-
-            # Emit progress update
-            await self.websocket_manager.send_scraping_update(
-                job_id,
-                "running",
-                current_page=page,
-                current_url=url,
-                vehicles_found=len(all_vehicles),
-                message=f"Scraping page {page}..."
-            )
-
-            # Scrape the page
-            page_vehicles = await self.scrape_listings_page(url)
-            
-            if not page_vehicles:
-                logger.info(f"No vehicles found on page {page}. Ending scraping.")
-                break
-
-            all_vehicles.extend(page_vehicles)
-            logger.info(f"Found {len(page_vehicles)} vehicles on page {page}")
+        async with aclosing(self._iter_listing_pages(max_pages)) as pages:
+            async for page, url, page_vehicles in pages:
+                logger.info(f"Scraping page {page}: {url}")
+
+                # Emit progress update
+                await self.websocket_manager.send_scraping_update(
+                    job_id,
+                    "running",
+                    current_page=page,
+                    current_url=url,
+                    vehicles_found=len(all_vehicles),
+                    message=f"Scraping page {page}..."
+                )
+
+                if not page_vehicles:
+                    logger.info(f"No vehicles found on page {page}. Ending scraping.")
+                    break
 
-            # Check if this was the last page
-            if len(page_vehicles) < self.items_per_page:
-                logger.info("Last page reached")
-                break
+                all_vehicles.extend(page_vehicles)
+                logger.info(f"Found {len(page_vehicles)} vehicles on page {page}")
 
-            # Move to next page
-            start += self.items_per_page
-            page += 1
+                # Check if this was the last page
+                if len(page_vehicles) < self.items_per_page:
+                    logger.info("Last page reached")
+                    break
 
         # Emit completion
         await self.websocket_manager.send_scraping_update(
@@ -967,13 +1102,35 @@ class MercadoLibreScraper:
         logger.info(f"Scraping completed. Total vehicles found: {len(all_vehicles)}")
         return all_vehicles
 
-    async def scrape_all_listings_with_incremental_save(self, job_id: str, max_pages: Optional[int], vehicle_service, db) -> List[VehicleCreate]:
-        """Scrape all vehicle listings with incremental saving after each page"""
-        all_vehicles = []
-        page = 1
-        start = 1
+    async def scrape_all_listings_with_incremental_save(self, job_id: str, max_pages: Optional[int], vehicle_service, db) -> Tuple[int, int, int]:
+        """
+        Scrape all vehicle listings with incremental saving after each page.
+        Only one page of vehicles is held in memory; returns (found, saved, failed) counts.
+        """
+        total_found = 0
+        page = 0
         total_saved = 0
         total_failed = 0
+        last_progress_flush = 0.0
+
+        # Progress update document reused across pages; only its values change
+        job_filter = {"_id": job_id}
+        progress_results = {
+            "total_scraped": 0,
+            "saved_to_db": 0,
+            "failed_to_save": 0,
+            "current_page": 0,
+            "last_page_vehicles": 0
+        }
+        progress_fields = {
+            "total_items": 0,
+            "processed_items": 0,
+            "successful_items": 0,
+            "failed_items": 0,
+            "progress_percentage": 0.0,
+            "results": progress_results
+        }
+        progress_update = {"$set": progress_fields}
 
         # Emit initial progress
         await self.websocket_manager.send_scraping_update(
@@ -986,109 +1143,90 @@ class MercadoLibreScraper:
             message="Starting to scrape listings..."
         )
 
-        while True:
-            if max_pages and page > max_pages:
-                break
-
-            # Construct URL
-            if start == 1:
-                url = self.base_url
-            else:
-                url = f"{self.base_url}/_Desde_{start}_NoIndex_True"
-
-            logger.info(f"Scraping page {page}: {url}")
-
-            # Emit progress update for page start
-            await self.websocket_manager.send_scraping_update(
-                job_id,
-                "running",
-                current_page=page,
-                current_url=url,
-                vehicles_found=len(all_vehicles),
-                vehicles_saved=total_saved,
-                message=f"Scraping page {page}..."
-            )
-
-            # Scrape the page
-            page_vehicles = await self.scrape_listings_page(url)
-            
-            if not page_vehicles:
-                logger.info(f"No vehicles found on page {page}. Ending scraping.")
-                break
+        async with aclosing(self._iter_listing_pages(max_pages)) as pages:
+            async for page, url, page_vehicles in pages:
+                logger.info(f"Scraping page {page}: {url}")
+
+                # Emit progress update for page start
+                await self.websocket_manager.send_scraping_update(
+                    job_id,
+                    "running",
+                    current_page=page,
+                    current_url=url,
+                    vehicles_found=total_found,
+                    vehicles_saved=total_saved,
+                    message=f"Scraping page {page}..."
+                )
+
+                if not page_vehicles:
+                    logger.info(f"No vehicles found on page {page}. Ending scraping.")
+                    break
 
-            all_vehicles.extend(page_vehicles)
-            logger.info(f"Found {len(page_vehicles)} vehicles on page {page}")
+                total_found += len(page_vehicles)
+                logger.info(f"Found {len(page_vehicles)} vehicles on page {page}")
 
-            # Save vehicles from this page to database immediately
-            page_saved = 0
-            page_failed = 0
-            
-            for vehicle_data in page_vehicles:
+                # Save vehicles from this page to database immediately, in one bulk write
                 try:
-                    saved_vehicle = await vehicle_service.create_or_update_vehicle(vehicle_data, job_id)
-                    page_saved += 1
-                    total_saved += 1
+                    save_counts = await vehicle_service.bulk_create_or_update(page_vehicles, job_id)
+                    page_saved = save_counts["created"] + save_counts["updated"]
+                    page_failed = save_counts["failed"]
                 except Exception as e:
-                    logger.error(f"Error saving vehicle {vehicle_data.mercadolibre_id}: {e}")
-                    page_failed += 1
-                    total_failed += 1
-
-            logger.info(f"Page {page}: Saved {page_saved} vehicles, failed {page_failed}")
-
-            # Calculate progress percentage
-            if max_pages:
-                progress_percentage = (page / max_pages) * 100
-                logger.info(f"🔍 DEBUG: Progress calculation - page: {page}, max_pages: {max_pages}, progress: {progress_percentage}%")
-            else:
-                # For unlimited pages, we can't calculate exact progress
-                # Use a formula based on vehicles found
-                progress_percentage = min(95, (len(all_vehicles) / 100) * 10)  # Cap at 95% until completion
-                logger.info(f"🔍 DEBUG: Progress calculation (unlimited) - vehicles: {len(all_vehicles)}, progress: {progress_percentage}%")
-
-            # Update job status in database after each page
-            await db.scraping_jobs.update_one(
-                {"_id": job_id},
-                {
-                    "$set": {
-                        "total_items": len(all_vehicles),
-                        "processed_items": len(all_vehicles),
-                        "successful_items": total_saved,
-                        "failed_items": total_failed,
-                        "progress_percentage": progress_percentage,
-                        "results": {
-                            "total_scraped": len(all_vehicles),
-                            "saved_to_db": total_saved,
-                            "failed_to_save": total_failed,
-                            "current_page": page,
-                            "last_page_vehicles": len(page_vehicles)
-                        }
-                    }
-                }
-            )
+                    logger.error(f"Error saving vehicles from page {page}: {e}")
+                    page_saved = 0
+                    page_failed = len(page_vehicles)
+                total_saved += page_saved
+                total_failed += page_failed
 
-            # Emit progress update for page completion
-            await self.websocket_manager.send_scraping_update(
-                job_id,
-                "running",
-                progress_percentage=progress_percentage,
-                current_page=page,
-                vehicles_found=len(all_vehicles),
-                vehicles_saved=total_saved,
-                vehicles_failed=total_failed,
-                page_vehicles=len(page_vehicles),
-                page_saved=page_saved,
-                page_failed=page_failed,
-                message=f"Page {page} completed: {page_saved} vehicles saved"
-            )
-
-            # Check if this was the last page
-            if len(page_vehicles) < self.items_per_page:
-                logger.info("Last page reached")
-                break
+                logger.info(f"Page {page}: Saved {page_saved} vehicles, failed {page_failed}")
 
-            # Move to next page
-            start += self.items_per_page
-            page += 1
+                # Calculate progress percentage
+                if max_pages:
+                    progress_percentage = (page / max_pages) * 100
+                    if settings.DEBUG_SCRAPING:
+                        logger.info(f"🔍 DEBUG: Progress calculation - page: {page}, max_pages: {max_pages}, progress: {progress_percentage}%")
+                else:
+                    # For unlimited pages, we can't calculate exact progress
+                    # Use a formula based on vehicles found
+                    progress_percentage = min(95, (total_found / 100) * 10)  # Cap at 95% until completion
+                    if settings.DEBUG_SCRAPING:
+                        logger.info(f"🔍 DEBUG: Progress calculation (unlimited) - vehicles: {total_found}, progress: {progress_percentage}%")
+
+                # Persist job progress at most every few seconds; the final update below always runs
+                is_last_page = len(page_vehicles) < self.items_per_page or page == max_pages
+                now = time.monotonic()
+                if is_last_page or now - last_progress_flush >= _PROGRESS_FLUSH_INTERVAL:
+                    last_progress_flush = now
+                    progress_fields["total_items"] = total_found
+                    progress_fields["processed_items"] = total_found
+                    progress_fields["successful_items"] = total_saved
+                    progress_fields["failed_items"] = total_failed
+                    progress_fields["progress_percentage"] = progress_percentage
+                    progress_results["total_scraped"] = total_found
+                    progress_results["saved_to_db"] = total_saved
+                    progress_results["failed_to_save"] = total_failed
+                    progress_results["current_page"] = page
+                    progress_results["last_page_vehicles"] = len(page_vehicles)
+                    await db.scraping_jobs.update_one(job_filter, progress_update)
+
+                # Emit progress update for page completion
+                await self.websocket_manager.send_scraping_update(
+                    job_id,
+                    "running",
+                    progress_percentage=progress_percentage,
+                    current_page=page,
+                    vehicles_found=total_found,
+                    vehicles_saved=total_saved,
+                    vehicles_failed=total_failed,
+                    page_vehicles=len(page_vehicles),
+                    page_saved=page_saved,
+                    page_failed=page_failed,
+                    message=f"Page {page} completed: {page_saved} vehicles saved"
+                )
+
+                # Check if this was the last page
+                if len(page_vehicles) < self.items_per_page:
+                    logger.info("Last page reached")
+                    break
 
         # Final completion update
         await db.scraping_jobs.update_one(
@@ -1098,12 +1236,12 @@ class MercadoLibreScraper:
                     "status": "completed",
                     "completed_at": datetime.utcnow(),
                     "progress_percentage": 100.0,
-                    "total_items": len(all_vehicles),
-                    "processed_items": len(all_vehicles),
+                    "total_items": total_found,
+                    "processed_items": total_found,
                     "successful_items": total_saved,
                     "failed_items": total_failed,
                     "results": {
-                        "total_scraped": len(all_vehicles),
+                        "total_scraped": total_found,
                         "saved_to_db": total_saved,
                         "failed_to_save": total_failed,
                         "total_pages": page,
@@ -1118,12 +1256,12 @@ class MercadoLibreScraper:
             job_id,
             "completed",
             progress_percentage=100,
-            total_vehicles=len(all_vehicles),
+            total_vehicles=total_found,
             vehicles_saved=total_saved,
             vehicles_failed=total_failed,
             total_pages=page,
-            message=f"Scraping completed! Found {len(all_vehicles)} vehicles, saved {total_saved}."
+            message=f"Scraping completed! Found {total_found} vehicles, saved {total_saved}."
         )
 
-        logger.info(f"Scraping completed. Total vehicles found: {len(all_vehicles)}, saved: {total_saved}, failed: {total_failed}")
-        return all_vehicles 
\ No newline at end of file
+        logger.info(f"Scraping completed. Total vehicles found: {total_found}, saved: {total_saved}, failed: {total_failed}")
+        return total_found, total_saved, total_failed 
\ No newline at end of file
@@ -1,9 +1,15 @@
 import asyncio
+from collections import OrderedDict
+from functools import lru_cache
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import logging
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
 import re
+import time
 
 from models.vehicle import (
     Vehicle, 
@@ -19,10 +25,140 @@ from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# First number in a kilometers string such as "45.000 Km"
+_KILOMETERS_RE = re.compile(r'\d[\d.,]*')
+
+def parse_kilometers(kilometers: Optional[str]) -> Optional[int]:
+    """Parse a scraped kilometers string into an int, or None if it has no number"""
+    if not kilometers:
+        return None
+    match = _KILOMETERS_RE.search(kilometers)
+    if not match:
+        return None
+    # Dots and commas are thousand separators in Colombian listings
+    return int(match.group().replace(".", "").replace(",", ""))
+
+# Text filters matched as case-insensitive prefixes on an indexed lowercase copy ("<field>_lc")
+_PREFIX_FILTER_FIELDS = ("brand", "model", "location", "fuel_type", "transmission")
+
+def derive_search_fields(vehicle: Dict[str, Any]) -> Dict[str, Any]:
+    """Indexed query fields derived from the scraped fields present in a vehicle document"""
+    fields = {}
+    if "kilometers" in vehicle:
+        fields["kilometers_numeric"] = parse_kilometers(vehicle["kilometers"])
+    for field in _PREFIX_FILTER_FIELDS:
+        if field in vehicle:
+            value = vehicle[field]
+            fields[f"{field}_lc"] = value.lower() if value else None
+    return fields
+
+def _vehicle_id_filter(vehicle_id: str) -> Dict[str, Any]:
+    """Query for a vehicle id: ObjectId strings match _id, anything else the MercadoLibre ID"""
+    if ObjectId.is_valid(vehicle_id):
+        return {"_id": ObjectId(vehicle_id)}
+    return {"mercadolibre_id": vehicle_id}
+
+def _price_drop_fields(previous_price: Optional[float], current_price: Optional[float], now: datetime) -> Dict[str, Any]:
+    """Price change fields stored on the vehicle so price drops can be read off an index"""
+    if not current_price:
+        return {}
+    price_drop_pct = (previous_price - current_price) / previous_price * 100 if previous_price else 0.0
+    return {
+        "previous_price_numeric": previous_price,
+        "price_drop_pct": price_drop_pct,
+        "price_updated_at": now
+    }
+
+def _scraped_update_fields(vehicle_data: VehicleCreate, previous_price: Optional[float], now: datetime) -> Dict[str, Any]:
+    """$set fields for re-scraped data of a listing that is already stored"""
+    update_data = vehicle_data.model_dump(exclude_unset=True)
+    update_data.update(derive_search_fields(update_data))
+    update_data["updated_at"] = now
+    update_data["last_scraped_at"] = now
+    update_data.update(_price_drop_fields(previous_price, vehicle_data.price_numeric, now))
+    return update_data
+
+# Words of a free-text search; punctuation separates terms
+_SEARCH_TOKEN_RE = re.compile(r"[^\W_]+")
+
+@lru_cache(maxsize=1024)
+def _search_terms_filter(search_terms: str) -> Dict[str, Any]:
+    """Query fragment for space-separated search terms, cached per normalized search; do not mutate"""
+    terms = search_terms.split()
+    # No $text clause: it only matches whole (stemmed) words, so partial terms
+    # such as "civ" would find nothing; every term is a case-insensitive substring
+    query: Dict[str, Any] = {}
+    
+    # Terms are word characters only, so they are safe to use as patterns
+    search_conditions = []
+    for term in terms:
+        term_pattern = {"$regex": term, "$options": "i"}
+        # Search across multiple fields
+        search_conditions.append({
+            "$or": [
+                {"title": term_pattern},
+                {"brand": term_pattern},
+                {"model": term_pattern},
+                {"edition": term_pattern},
+                {"location": term_pattern}
+            ]
+        })
+    
+    # All search terms must match (AND logic)
+    if len(search_conditions) == 1:
+        query.update(search_conditions[0])
+    else:
+        query["$and"] = search_conditions
+    return query
+
+class VehicleCache:
+    """Small LRU of vehicles looked up by id, with entries expiring after a short TTL"""
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Vehicle]]" = OrderedDict()
+        # Bumped by every invalidation; a read that overlapped one must not cache its result
+        self.generation = 0
+
+    def get(self, key: str) -> Optional[Vehicle]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, vehicle = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        # Each caller gets its own copy, so one request can't mutate another's result
+        return vehicle.model_copy(deep=True)
+
+    def put(self, key: str, vehicle: Vehicle, generation: Optional[int] = None):
+        """Cache a vehicle; pass the generation read before fetching it to skip results a write may have made stale"""
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, vehicle.model_copy(deep=True))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *keys: Any):
+        self.generation += 1
+        for key in keys:
+            self._entries.pop(str(key), None)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+# Shared by all service instances, since routes create a VehicleService per request.
+# Keyed by the id as requested (ObjectId string or MercadoLibre ID); writes invalidate both.
+vehicle_cache = VehicleCache()
+
 class VehicleService:
     """Service for vehicle database operations"""
     
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncDatabase):
         self.db = db
         self.vehicles_collection = db.vehicles
         self.price_history_collection = db.price_history
@@ -31,50 +167,40 @@ class VehicleService:
     async def create_or_update_vehicle(self, vehicle_data: VehicleCreate, scraping_session_id: Optional[str] = None) -> Dict[str, Any]:
         """Create a new vehicle or update existing one"""
         try:
-            # Check if vehicle already exists
-            existing_vehicle = await self.vehicles_collection.find_one({
-                "mercadolibre_id": vehicle_data.mercadolibre_id
-            })
-            
             current_time = datetime.utcnow()
             
+            # Dump once; the update only carries the fields the scraper actually set
+            vehicle_dict = vehicle_data.model_dump()
+            update_data = {field: vehicle_dict[field] for field in vehicle_data.model_fields_set}
+            update_data.update(derive_search_fields(update_data))
+            
+            update_data["updated_at"] = current_time
+            update_data["last_scraped_at"] = current_time
+            
+            # The stored price becomes the previous price for drop detection
+            existing_vehicle = await self.vehicles_collection.find_one(
+                {"mercadolibre_id": vehicle_data.mercadolibre_id},
+                {"price_numeric": 1}
+            )
+            vehicle = None
             if existing_vehicle:
-                # Update existing vehicle
-                update_data = vehicle_data.dict(exclude_unset=True)
-                update_data["updated_at"] = current_time
-                update_data["last_scraped_at"] = current_time
-                
-                # Always record price history on every scrape (not just changes)
-                if vehicle_data.price_numeric:
-                    await self._record_price_change(
-                        existing_vehicle["_id"],
-                        vehicle_data.mercadolibre_id,
-                        vehicle_data.price,
-                        vehicle_data.price_numeric,
-                        scraping_session_id
-                    )
-                
-                result = await self.vehicles_collection.update_one(
+                update_data.update(_price_drop_fields(existing_vehicle.get("price_numeric"), vehicle_data.price_numeric, current_time))
+                vehicle = await self.vehicles_collection.find_one_and_update(
                     {"_id": existing_vehicle["_id"]},
-                    {"$set": update_data}
+                    {"$set": update_data},
+                    return_document=ReturnDocument.AFTER
                 )
-                
+            
+            if vehicle:
                 # Update canonical vehicle stats if this vehicle is linked to one
-                if existing_vehicle.get("canonical_vehicle_id"):
-                    await self.canonical_service.update_canonical_vehicle_stats(
-                        existing_vehicle["canonical_vehicle_id"]
-                    )
-                
-                if result.modified_count > 0:
-                    return await self.vehicles_collection.find_one({"_id": existing_vehicle["_id"]})
-                else:
-                    return existing_vehicle
+                canonical_id = vehicle.get("canonical_vehicle_id")
             else:
                 # Find or create canonical vehicle
                 canonical_id = await self.canonical_service.find_or_create_canonical_vehicle(vehicle_data)
                 
-                # Create new vehicle
-                vehicle_dict = vehicle_data.dict()
+                # Create new vehicle; $setOnInsert keeps a concurrent insert of the same listing intact
+                vehicle_dict.update(derive_search_fields(vehicle_dict))
+                vehicle_dict.update(_price_drop_fields(None, vehicle_data.price_numeric, current_time))
                 vehicle_dict["created_at"] = current_time
                 vehicle_dict["updated_at"] = current_time
                 vehicle_dict["last_scraped_at"] = current_time
@@ -83,85 +209,224 @@ class VehicleService:
                 vehicle_dict["tracking_count"] = 0
                 vehicle_dict["canonical_vehicle_id"] = canonical_id
                 
-                result = await self.vehicles_collection.insert_one(vehicle_dict)
-                
-                # Record initial price
-                if vehicle_data.price_numeric:
-                    await self._record_price_change(
-                        result.inserted_id,
-                        vehicle_data.mercadolibre_id,
-                        vehicle_data.price,
-                        vehicle_data.price_numeric,
-                        scraping_session_id
-                    )
-                
-                # Update canonical vehicle stats
-                if canonical_id:
-                    await self.canonical_service.update_canonical_vehicle_stats(canonical_id)
-                
-                return await self.vehicles_collection.find_one({"_id": result.inserted_id})
+                vehicle = await self.vehicles_collection.find_one_and_update(
+                    {"mercadolibre_id": vehicle_data.mercadolibre_id},
+                    {"$setOnInsert": vehicle_dict},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+            vehicle_cache.invalidate(vehicle["_id"], vehicle_data.mercadolibre_id)
+            
+            # Always record price history on every scrape (not just changes); the history
+            # insert and canonical stats refresh are independent, so their round-trips overlap
+            pending = []
+            if vehicle_data.price_numeric:
+                pending.append(self.flush_price_history([self._price_history_document(
+                    vehicle["_id"],
+                    vehicle_data.mercadolibre_id,
+                    vehicle_data.price,
+                    vehicle_data.price_numeric,
+                    scraping_session_id
+                )]))
+            
+            if canonical_id:
+                pending.append(self.canonical_service.update_canonical_vehicle_stats(canonical_id))
+            
+            await asyncio.gather(*pending)
+            
+            return vehicle
                 
         except Exception as e:
             logger.error(f"Error creating/updating vehicle {vehicle_data.mercadolibre_id}: {e}")
             raise
 
-    async def _record_price_change(
-        self, 
-        vehicle_id: str, 
-        mercadolibre_id: str, 
-        price: Optional[str], 
-        price_numeric: float,
-        scraping_session_id: Optional[str] = None
-    ):
-        """Record price change in time series history collection"""
+    async def bulk_create_or_update(self, vehicles: List[VehicleCreate], scraping_session_id: Optional[str] = None) -> Dict[str, int]:
+        """Create or update a batch of vehicles with a single bulk_write; returns created/updated/failed counts"""
+        counts = {"created": 0, "updated": 0, "failed": 0}
+        if not vehicles:
+            return counts
+
+        # A listing that shows up twice in the batch keeps its last scraped data
+        vehicles_by_ml_id = {vehicle.mercadolibre_id: vehicle for vehicle in vehicles}
+        existing_vehicles = await self.vehicles_collection.find(
+            {"mercadolibre_id": {"$in": list(vehicles_by_ml_id)}},
+            {"_id": 1, "mercadolibre_id": 1, "canonical_vehicle_id": 1, "price_numeric": 1}
+        ).to_list(length=None)
+        existing_by_ml_id = {vehicle["mercadolibre_id"]: vehicle for vehicle in existing_vehicles}
+
+        current_time = datetime.utcnow()
+        operations = []
+        canonical_ids = set()
+
+        for ml_id, vehicle_data in vehicles_by_ml_id.items():
+            existing_vehicle = existing_by_ml_id.get(ml_id)
+            if existing_vehicle:
+                operations.append(UpdateOne(
+                    {"_id": existing_vehicle["_id"]},
+                    {"$set": _scraped_update_fields(vehicle_data, existing_vehicle.get("price_numeric"), current_time)}
+                ))
+
+                if existing_vehicle.get("canonical_vehicle_id"):
+                    canonical_ids.add(existing_vehicle["canonical_vehicle_id"])
+            else:
+                # Canonical matching stays sequential so new listings in the batch can group together
+                canonical_id = await self.canonical_service.find_or_create_canonical_vehicle(vehicle_data)
+
+                vehicle_dict = vehicle_data.model_dump()
+                vehicle_dict.update(derive_search_fields(vehicle_dict))
+                vehicle_dict.update(_price_drop_fields(None, vehicle_data.price_numeric, current_time))
+                vehicle_dict["created_at"] = current_time
+                vehicle_dict["updated_at"] = current_time
+                vehicle_dict["last_scraped_at"] = current_time
+                vehicle_dict["status"] = VehicleStatus.ACTIVE
+                vehicle_dict["views_count"] = 0
+                vehicle_dict["tracking_count"] = 0
+                vehicle_dict["canonical_vehicle_id"] = canonical_id
+                operations.append(UpdateOne({"mercadolibre_id": ml_id}, {"$setOnInsert": vehicle_dict}, upsert=True))
+
+                if canonical_id:
+                    canonical_ids.add(canonical_id)
+
+        ml_ids = list(vehicles_by_ml_id)
+        failed_ml_ids = set()
         try:
-            # Convert ObjectId to string if needed
-            vehicle_id_str = str(vehicle_id)
-            
-            # Convert None price to string representation of numeric price
-            price_str = price if price is not None else str(int(price_numeric))
-            
-            price_record = PriceHistory.create_from_vehicle_data(
-                vehicle_id=vehicle_id_str,
-                mercadolibre_id=mercadolibre_id,
-                price=price_str,
-                price_numeric=price_numeric,
-                scraping_session_id=scraping_session_id
-            )
-            
-            # Convert to dict and let MongoDB generate the _id
-            price_record_dict = price_record.dict(by_alias=True)
-            
-            result = await self.price_history_collection.insert_one(price_record_dict)
+            result = await self.vehicles_collection.bulk_write(operations, ordered=False)
+            upserted_ids = result.upserted_ids
+        except BulkWriteError as e:
+            failed_ml_ids = {ml_ids[error["index"]] for error in e.details.get("writeErrors", [])}
+            upserted_ids = {upserted["index"]: upserted["_id"] for upserted in e.details.get("upserted", [])}
+            logger.error(f"Error bulk saving vehicles: {len(failed_ml_ids)} of {len(operations)} writes failed")
+        created_ids = {ml_ids[index]: vehicle_id for index, vehicle_id in upserted_ids.items()}
+
+        # A new listing that was not upserted was inserted by another writer after the find;
+        # apply this scrape's data to it as an update
+        missed = [
+            ml_id for ml_id in ml_ids
+            if ml_id not in existing_by_ml_id and ml_id not in created_ids and ml_id not in failed_ml_ids
+        ]
+        if missed:
+            failed_ml_ids.update(await self._update_raced_vehicles(missed, vehicles_by_ml_id, existing_by_ml_id, current_time))
+            for ml_id in missed:
+                existing_vehicle = existing_by_ml_id.get(ml_id)
+                if existing_vehicle and existing_vehicle.get("canonical_vehicle_id"):
+                    canonical_ids.add(existing_vehicle["canonical_vehicle_id"])
+
+        # Always record price history on every scrape (not just changes)
+        price_records = []
+        for ml_id, vehicle_data in vehicles_by_ml_id.items():
+            existing_vehicle = existing_by_ml_id.get(ml_id)
+            if ml_id in failed_ml_ids:
+                counts["failed"] += 1
+                continue
+            elif existing_vehicle:
+                vehicle_id = existing_vehicle["_id"]
+                vehicle_cache.invalidate(vehicle_id, ml_id)
+                counts["updated"] += 1
+            elif ml_id in created_ids:
+                vehicle_id = created_ids[ml_id]
+                counts["created"] += 1
+            else:
+                # Neither upserted nor found again (e.g. deleted in between)
+                counts["failed"] += 1
+                continue
+
+            if vehicle_data.price_numeric:
+                price_records.append(self._price_history_document(
+                    vehicle_id,
+                    ml_id,
+                    vehicle_data.price,
+                    vehicle_data.price_numeric,
+                    scraping_session_id
+                ))
+
+        await asyncio.gather(
+            self.flush_price_history(price_records),
+            *(self.canonical_service.update_canonical_vehicle_stats(canonical_id) for canonical_id in canonical_ids)
+        )
+
+        return counts
+
+    async def _update_raced_vehicles(
+        self,
+        ml_ids: List[str],
+        vehicles_by_ml_id: Dict[str, VehicleCreate],
+        existing_by_ml_id: Dict[str, Dict[str, Any]],
+        current_time: datetime
+    ) -> set:
+        """Update listings another writer inserted mid-batch; adds them to existing_by_ml_id and returns failed ML IDs"""
+        raced_vehicles = await self.vehicles_collection.find(
+            {"mercadolibre_id": {"$in": ml_ids}},
+            {"_id": 1, "mercadolibre_id": 1, "canonical_vehicle_id": 1, "price_numeric": 1}
+        ).to_list(length=None)
+        if not raced_vehicles:
+            return set()
+
+        operations = []
+        for vehicle in raced_vehicles:
+            existing_by_ml_id[vehicle["mercadolibre_id"]] = vehicle
+            operations.append(UpdateOne(
+                {"_id": vehicle["_id"]},
+                {"$set": _scraped_update_fields(
+                    vehicles_by_ml_id[vehicle["mercadolibre_id"]], vehicle.get("price_numeric"), current_time
+                )}
+            ))
+
+        try:
+            await self.vehicles_collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            logger.error(f"Error updating {len(operations)} concurrently inserted vehicles: {e}")
+            return {raced_vehicles[error["index"]]["mercadolibre_id"] for error in e.details.get("writeErrors", [])}
+        return set()
+
+    async def flush_price_history(self, price_records: List[Dict[str, Any]]):
+        """Insert a batch of price history documents in one unordered insert_many"""
+        if not price_records:
+            return
+        try:
+            await self.price_history_collection.insert_many(price_records, ordered=False)
             
             if settings.DEBUG_SCRAPING:
-                logger.info(f"🔍 DEBUG: Price history recorded for vehicle {vehicle_id_str}, price: {price_str}, _id: {result.inserted_id}")
-            
+                logger.info(f"🔍 DEBUG: Price history recorded for {len(price_records)} vehicles")
         except Exception as e:
-            logger.error(f"Error recording price change for vehicle {vehicle_id}: {e}")
-            if settings.DEBUG_SCRAPING:
-                import traceback
-                logger.info(f"🔍 DEBUG: Price history error traceback: {traceback.format_exc()}")
+            logger.error(f"Error recording price history for {len(price_records)} vehicles: {e}", exc_info=settings.DEBUG_SCRAPING)
+
+    @staticmethod
+    def _price_history_document(
+        vehicle_id: str,
+        mercadolibre_id: str,
+        price: Optional[str],
+        price_numeric: float,
+        scraping_session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build a price history document ready to insert (no I/O, so batches can be built up front)"""
+        # Convert None price to string representation of numeric price
+        price_str = price if price is not None else str(int(price_numeric))
+
+        price_record = PriceHistory.create_from_vehicle_data(
+            vehicle_id=str(vehicle_id),
+            mercadolibre_id=mercadolibre_id,
+            price=price_str,
+            price_numeric=price_numeric,
+            scraping_session_id=scraping_session_id
+        )
+
+        # Convert to dict and let MongoDB generate the _id
+        return price_record.model_dump(by_alias=True)
 
     async def get_vehicle_by_id(self, vehicle_id: str) -> Optional[Vehicle]:
         """Get vehicle by ID"""
+        cached = vehicle_cache.get(vehicle_id)
+        if cached is not None:
+            return cached
+        generation = vehicle_cache.generation
         try:
-            from bson import ObjectId
-            try:
-                # Convert string ID to ObjectId
-                object_id = ObjectId(vehicle_id)
-                vehicle = await self.vehicles_collection.find_one({"_id": object_id})
-                if vehicle:
-                    vehicle["_id"] = str(vehicle["_id"])
-                    return Vehicle(**vehicle)
-                return None
-            except Exception as e:
-                # If ID conversion fails, try searching by mercadolibre_id as fallback
-                vehicle = await self.vehicles_collection.find_one({"mercadolibre_id": vehicle_id})
-                if vehicle:
-                    vehicle["_id"] = str(vehicle["_id"])
-                    return Vehicle(**vehicle)
-                return None
+            vehicle = await self.vehicles_collection.find_one(_vehicle_id_filter(vehicle_id))
+            if vehicle:
+                vehicle["_id"] = str(vehicle["_id"])
+                result = Vehicle(**vehicle)
+                vehicle_cache.put(vehicle_id, result, generation)
+                return result
+            return None
         except Exception as e:
             logger.error(f"Error getting vehicle {vehicle_id}: {e}")
             return None
@@ -192,12 +457,19 @@ class VehicleService:
             # Calculate pagination
             skip = (page - 1) * page_size
             
-            # Get total count
-            total_count = await self.vehicles_collection.count_documents(query)
-            
-            # Get paginated results
-            cursor = self.vehicles_collection.find(query).sort("updated_at", -1).skip(skip).limit(page_size)
-            vehicles_data = await cursor.to_list(length=page_size)
+            # Get the total count and the requested page in one round-trip; $sort stays
+            # right after $match so the updated_at index can serve it
+            pipeline = [
+                {"$match": query},
+                {"$sort": {"updated_at": -1}},
+                {"$facet": {
+                    "results": [{"$skip": skip}, {"$limit": page_size}, {"$project": Vehicle.list_fields()}],
+                    "count": [{"$count": "n"}]
+                }}
+            ]
+            facet = (await (await self.vehicles_collection.aggregate(pipeline)).to_list(length=1))[0]
+            vehicles_data = facet["results"]
+            total_count = facet["count"][0]["n"] if facet["count"] else 0
             
             # Convert ObjectId to string for each vehicle
             vehicles = []
@@ -235,28 +507,9 @@ class VehicleService:
         
         # Text search across multiple fields
         if filters.search_query:
-            search_terms = filters.search_query.strip().split()
+            search_terms = _SEARCH_TOKEN_RE.findall(filters.search_query.lower())
             if search_terms:
-                # Create regex patterns for each search term (case-insensitive)
-                search_conditions = []
-                for term in search_terms:
-                    term_pattern = {"$regex": term, "$options": "i"}
-                    # Search across multiple fields
-                    search_conditions.append({
-                        "$or": [
-                            {"title": term_pattern},
-                            {"brand": term_pattern},
-                            {"model": term_pattern},
-                            {"edition": term_pattern},
-                            {"location": term_pattern}
-                        ]
-                    })
-                
-                # All search terms must match (AND logic)
-                if len(search_conditions) == 1:
-                    query.update(search_conditions[0])
-                else:
-                    query["$and"] = search_conditions
+                query.update(_search_terms_filter(" ".join(search_terms)))
         
         # Price filters
         price_filter = {}
@@ -271,60 +524,48 @@ class VehicleService:
         if filters.min_year or filters.max_year:
             year_filter = {}
             if filters.min_year:
-                year_filter["$gte"] = str(filters.min_year)
+                year_filter["$gte"] = filters.min_year
             if filters.max_year:
-                year_filter["$lte"] = str(filters.max_year)
+                year_filter["$lte"] = filters.max_year
             if year_filter:
                 query["year"] = year_filter
         
-        # Brand filter
-        if filters.brand:
-            query["brand"] = {"$regex": filters.brand, "$options": "i"}
-        
-        # Model filter
-        if filters.model:
-            query["model"] = {"$regex": filters.model, "$options": "i"}
+        # Brand, model, location, fuel type and transmission filters: an anchored,
+        # case-sensitive regex on the lowercase copy can use the index prefix
+        for field in _PREFIX_FILTER_FIELDS:
+            value = getattr(filters, field)
+            if value:
+                query[f"{field}_lc"] = {"$regex": f"^{re.escape(value.lower())}"}
         
-        # Location filter
-        if filters.location:
-            query["location"] = {"$regex": filters.location, "$options": "i"}
-        
-        # Fuel type filter
-        if filters.fuel_type:
-            query["fuel_type"] = {"$regex": filters.fuel_type, "$options": "i"}
-        
-        # Transmission filter
-        if filters.transmission:
-            query["transmission"] = {"$regex": filters.transmission, "$options": "i"}
-        
-        # Kilometers filters
-        if filters.min_kilometers or filters.max_kilometers:
-            # This requires parsing the kilometers string to extract numeric value
-            # For now, we'll implement a basic text search
-            kilometers_conditions = []
-            if filters.min_kilometers:
-                kilometers_conditions.append({"kilometers": {"$regex": f".*{filters.min_kilometers}.*"}})
-            if filters.max_kilometers:
-                kilometers_conditions.append({"kilometers": {"$regex": f".*{filters.max_kilometers}.*"}})
-            if kilometers_conditions:
-                query["$or"] = kilometers_conditions
+        # Kilometers filters (range on the numeric copy parsed at ingest)
+        kilometers_filter = {}
+        if filters.min_kilometers is not None:
+            kilometers_filter["$gte"] = filters.min_kilometers
+        if filters.max_kilometers is not None:
+            kilometers_filter["$lte"] = filters.max_kilometers
+        if kilometers_filter:
+            query["kilometers_numeric"] = kilometers_filter
         
         return query
 
     async def update_vehicle(self, vehicle_id: str, update_data: VehicleUpdate) -> Optional[Vehicle]:
         """Update vehicle by ID"""
         try:
-            update_dict = update_data.dict(exclude_unset=True)
+            update_dict = update_data.model_dump(exclude_unset=True)
+            update_dict.update(derive_search_fields(update_dict))
             update_dict["updated_at"] = datetime.utcnow()
             
-            result = await self.vehicles_collection.update_one(
-                {"_id": vehicle_id},
-                {"$set": update_dict}
+            vehicle = await self.vehicles_collection.find_one_and_update(
+                _vehicle_id_filter(vehicle_id),
+                {"$set": update_dict},
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.modified_count > 0:
-                vehicle = await self.vehicles_collection.find_one({"_id": vehicle_id})
-                return Vehicle(**vehicle) if vehicle else None
+            vehicle_cache.invalidate(vehicle_id)
+            if vehicle:
+                vehicle_cache.invalidate(vehicle["_id"], vehicle["mercadolibre_id"])
+                vehicle["_id"] = str(vehicle["_id"])
+                return Vehicle(**vehicle)
             
             return None
             
@@ -335,8 +576,14 @@ class VehicleService:
     async def delete_vehicle(self, vehicle_id: str) -> bool:
         """Delete vehicle by ID"""
         try:
-            result = await self.vehicles_collection.delete_one({"_id": vehicle_id})
-            return result.deleted_count > 0
+            vehicle = await self.vehicles_collection.find_one_and_delete(
+                _vehicle_id_filter(vehicle_id),
+                projection={"mercadolibre_id": 1}
+            )
+            vehicle_cache.invalidate(vehicle_id)
+            if vehicle:
+                vehicle_cache.invalidate(vehicle["_id"], vehicle["mercadolibre_id"])
+            return vehicle is not None
         except Exception as e:
             logger.error(f"Error deleting vehicle {vehicle_id}: {e}")
             raise
@@ -346,13 +593,13 @@ class VehicleService:
         try:
             # Query time series collection using metadata field
             query = {"metadata.vehicle_id": vehicle_id}
-            cursor = self.price_history_collection.find(query).sort("timestamp", -1)
+            cursor = self.price_history_collection.find(query, PriceHistory.chart_fields()).sort("timestamp", -1)
             
             if limit:
-                cursor = cursor.limit(limit)
+                cursor = cursor.limit(limit).batch_size(limit)
             
-            history_data = await cursor.to_list(length=limit)
-            return [PriceHistory(**record) for record in history_data]
+            # Build models as batches arrive instead of holding all raw records first
+            return [PriceHistory(**record) async for record in cursor]
             
         except Exception as e:
             logger.error(f"Error getting price history for vehicle {vehicle_id}: {e}")
@@ -361,116 +608,39 @@ class VehicleService:
     async def get_recent_vehicles(self, limit: int = 10) -> List[Vehicle]:
         """Get recently added/updated vehicles"""
         try:
-            cursor = self.vehicles_collection.find({
-                "status": VehicleStatus.ACTIVE
-            }).sort("updated_at", -1).limit(limit)
+            cursor = self.vehicles_collection.find(
+                {"status": VehicleStatus.ACTIVE},
+                Vehicle.list_fields()
+            ).sort("updated_at", -1).limit(limit).batch_size(limit)
             
-            vehicles_data = await cursor.to_list(length=limit)
-            return [Vehicle(**vehicle) for vehicle in vehicles_data]
+            return [Vehicle(**{**vehicle, "_id": str(vehicle["_id"])}) async for vehicle in cursor]
             
         except Exception as e:
             logger.error(f"Error getting recent vehicles: {e}")
             return []
 
     async def get_price_drops(self, hours: int = 24, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get vehicles with recent price drops using time series aggregation"""
+        """Get vehicles whose latest scraped price dropped within the last hours"""
         try:
             since_date = datetime.utcnow() - timedelta(hours=hours)
             
-            # Use MongoDB aggregation pipeline with time series collection
-            pipeline = [
-                # Match recent price records
-                {
-                    "$match": {
-                        "timestamp": {"$gte": since_date}
-                    }
-                },
-                # Sort by vehicle and timestamp
-                {
-                    "$sort": {
-                        "metadata.vehicle_id": 1,
-                        "timestamp": -1
-                    }
-                },
-                # Group by vehicle to get current and previous prices
-                {
-                    "$group": {
-                        "_id": "$metadata.vehicle_id",
-                        "mercadolibre_id": {"$first": "$metadata.mercadolibre_id"},
-                        "prices": {
-                            "$push": {
-                                "price_numeric": "$price_numeric",
-                                "timestamp": "$timestamp"
-                            }
-                        }
-                    }
-                },
-                # Filter vehicles with at least 2 price records
-                {
-                    "$match": {
-                        "prices.1": {"$exists": True}
-                    }
-                },
-                # Calculate price drops
-                {
-                    "$addFields": {
-                        "current_price": {"$arrayElemAt": ["$prices.price_numeric", 0]},
-                        "previous_price": {"$arrayElemAt": ["$prices.price_numeric", 1]},
-                        "price_drop": {
-                            "$subtract": [
-                                {"$arrayElemAt": ["$prices.price_numeric", 1]},
-                                {"$arrayElemAt": ["$prices.price_numeric", 0]}
-                            ]
-                        }
-                    }
-                },
-                # Filter only actual price drops (current < previous)
-                {
-                    "$match": {
-                        "price_drop": {"$gt": 0}
-                    }
-                },
-                # Calculate percentage and add fields
-                {
-                    "$addFields": {
-                        "price_drop_percentage": {
-                            "$multiply": [
-                                {
-                                    "$divide": [
-                                        "$price_drop",
-                                        "$previous_price"
-                                    ]
-                                },
-                                100
-                            ]
-                        }
-                    }
-                },
-                # Sort by price drop percentage (highest first)
-                {
-                    "$sort": {"price_drop_percentage": -1}
-                },
-                # Limit results
-                {"$limit": limit}
-            ]
-            
-            # Execute aggregation
-            price_drops_cursor = self.price_history_collection.aggregate(pipeline)
-            price_drops_data = await price_drops_cursor.to_list(length=limit)
+            # The drop against the previous scrape is stored on the vehicle at save time
+            cursor = self.vehicles_collection.find(
+                {"price_updated_at": {"$gte": since_date}, "price_drop_pct": {"$gt": 0}},
+                Vehicle.list_fields()
+            ).sort("price_drop_pct", -1).limit(limit).batch_size(limit)
             
-            # Enrich with vehicle data
             price_drops = []
-            for drop_data in price_drops_data:
-                vehicle = await self.get_vehicle_by_id(drop_data["_id"])
-                if vehicle:
-                    price_drop = {
-                        "vehicle": vehicle,
-                        "current_price": drop_data["current_price"],
-                        "previous_price": drop_data["previous_price"],
-                        "price_drop": drop_data["price_drop"],
-                        "price_drop_percentage": drop_data["price_drop_percentage"]
-                    }
-                    price_drops.append(price_drop)
+            async for vehicle_data in cursor:
+                vehicle_data["_id"] = str(vehicle_data["_id"])
+                vehicle = Vehicle(**vehicle_data)
+                price_drops.append({
+                    "vehicle": vehicle,
+                    "current_price": vehicle.price_numeric,
+                    "previous_price": vehicle.previous_price_numeric,
+                    "price_drop": vehicle.previous_price_numeric - vehicle.price_numeric,
+                    "price_drop_percentage": vehicle.price_drop_pct
+                })
             
             return price_drops
             
@@ -481,17 +651,20 @@ class VehicleService:
     async def get_vehicle_stats(self) -> Dict[str, Any]:
         """Get vehicle statistics"""
         try:
-            total_vehicles = await self.vehicles_collection.count_documents({})
-            active_vehicles = await self.vehicles_collection.count_documents({"status": VehicleStatus.ACTIVE})
-            sold_vehicles = await self.vehicles_collection.count_documents({"status": VehicleStatus.SOLD})
-            
-            # Average price
+            # Status counts and average price in a single pass; $avg skips missing/null prices
             pipeline = [
-                {"$match": {"price_numeric": {"$exists": True, "$ne": None}}},
-                {"$group": {"_id": None, "avg_price": {"$avg": "$price_numeric"}}}
+                {"$facet": {
+                    "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                    "avg": [{"$group": {"_id": None, "avg_price": {"$avg": "$price_numeric"}}}]
+                }}
             ]
-            avg_result = await self.vehicles_collection.aggregate(pipeline).to_list(length=1)
-            avg_price = avg_result[0]["avg_price"] if avg_result else 0
+            facet = (await (await self.vehicles_collection.aggregate(pipeline)).to_list(length=1))[0]
+            
+            status_counts = {group["_id"]: group["count"] for group in facet["by_status"]}
+            total_vehicles = sum(status_counts.values())
+            active_vehicles = status_counts.get(VehicleStatus.ACTIVE, 0)
+            sold_vehicles = status_counts.get(VehicleStatus.SOLD, 0)
+            avg_price = (facet["avg"][0]["avg_price"] if facet["avg"] else None) or 0
             
             return {
                 "total_vehicles": total_vehicles,
@@ -1,16 +1,25 @@
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import socketio
 
+from models.vehicle import ScrapingJobStatus
+
 logger = logging.getLogger(__name__)
 
+# Progress updates for a job within this many seconds are merged into one emit
+_SCRAPING_UPDATE_INTERVAL = 0.1
+# Statuses emitted right away so clients see the outcome without waiting for a flush
+_FINAL_SCRAPING_STATUSES = (ScrapingJobStatus.COMPLETED, ScrapingJobStatus.FAILED, ScrapingJobStatus.CANCELLED)
+
 class WebSocketManager:
     """Socket.IO connection manager for real-time updates"""
     
     def __init__(self, sio: socketio.AsyncServer):
         self.sio = sio
+        self._pending_scraping_updates: Dict[str, Dict[str, Any]] = {}
+        self._scraping_flush_task: Optional[asyncio.Task] = None
         
     async def send_to_client(self, client_id: str, message_type: str, data: Any):
         """Send a message to a specific client"""
@@ -44,20 +53,31 @@ class WebSocketManager:
             await self.broadcast(message_type, data)
     
     async def send_scraping_update(self, job_id: str, status: str, **kwargs):
-        """Send scraping progress update"""
-        data = {
-            "job": {
-                "_id": job_id,
-                "status": status,
-                **kwargs
-            }
-        }
+        """Send scraping progress update; progress within the flush interval is merged per job"""
+        job = self._pending_scraping_updates.setdefault(job_id, {"_id": job_id})
+        job["status"] = status
+        job.update(kwargs)
+        
+        if status in _FINAL_SCRAPING_STATUSES:
+            await self._emit_scraping_update(job_id)
+        elif self._scraping_flush_task is None:
+            self._scraping_flush_task = asyncio.create_task(self._flush_scraping_updates())
+    
+    async def _flush_scraping_updates(self):
+        """Emit the merged progress of every job after the flush interval"""
+        await asyncio.sleep(_SCRAPING_UPDATE_INTERVAL)
+        self._scraping_flush_task = None
+        for job_id in list(self._pending_scraping_updates):
+            await self._emit_scraping_update(job_id)
+    
+    async def _emit_scraping_update(self, job_id: str):
+        """Emit a job's pending update to its room"""
+        job = self._pending_scraping_updates.pop(job_id, None)
+        if job is None:
+            return
         room = f"scraping_job_{job_id}"
-        logger.info(f"🔍 DEBUG: Sending scraping update to room {room}: {data}")
-        logger.info(f"🔍 DEBUG: Event name: scraping_job_update")
-        logger.info(f"🔍 DEBUG: Data structure: {type(data)}")
-        logger.info(f"🔍 DEBUG: Data keys: {list(data.keys())}")
-        await self.sio.emit("scraping_job_update", data, room=room)
+        logger.debug("Sending scraping update to room %s: status=%s", room, job["status"])
+        await self.sio.emit("scraping_job_update", {"job": job}, room=room)
     
     async def send_price_alert(self, alert_data: Dict[str, Any]):
         """Send price alert notification"""
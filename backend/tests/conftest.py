@@ -3,7 +3,13 @@ Pytest configuration and shared fixtures for MercadoSniper tests.
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
+import re
+import statistics
+from collections import defaultdict
+from datetime import datetime
+from bson import ObjectId
 from typing import AsyncGenerator, Dict, Any
 import os
 import sys
@@ -12,23 +18,65 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from services.canonical_vehicle_service import CanonicalVehicleService
-from services.vehicle_service import VehicleService
+from services.vehicle_service import VehicleService, vehicle_cache
 from models.vehicle import VehicleCreate, CanonicalVehicleCreate
 
 
 @pytest.fixture(scope="session")
 def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    """Create an event loop for the test session, using uvloop when it is installed."""
+    # uvloop ships with uvicorn[standard]; fall back to the default loop without it
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
 
 
+# Fixed clock for service writes; timestamps stay deterministic across runs
+_FROZEN_NOW = datetime(2024, 1, 1, 0, 0, 0)
+
+
+class FrozenDatetime(datetime):
+    """datetime whose utcnow() always returns the frozen test time"""
+    
+    @classmethod
+    def utcnow(cls):
+        return _FROZEN_NOW
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _freeze_time():
+    """Freeze datetime.utcnow() inside the services for the whole session."""
+    # pytest's monkeypatch fixture is function-scoped, so use a MonkeyPatch context directly
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("services.vehicle_service.datetime", FrozenDatetime)
+        mp.setattr("services.canonical_vehicle_service.datetime", FrozenDatetime)
+        yield _FROZEN_NOW
+
+
+def mock_field(doc, key):
+    """Resolve a possibly dotted field path in a document"""
+    for part in key.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _clone(doc):
+    """Copy a stored document so callers can't mutate the mock's state"""
+    # A top-level copy keeps ObjectId/datetime values intact and is all the services need
+    return doc.copy()
+
+
 class MockCursor:
     """Mock MongoDB cursor for testing"""
     
     def __init__(self, data, query=None):
-        self.data = list(data)  # Make a copy
+        self.data = data  # to_list copies the filtered results, so the source is not copied here
         self.query = query or {}
         self._filtered_data = self._apply_query_filter()
         self._skip_count = 0
@@ -45,7 +93,11 @@ class MockCursor:
         for doc in self.data:
             match = True
             for key, value in self.query.items():
-                if key == "_id" and doc.get("_id") != value:
+                if isinstance(value, dict) and "$in" in value:
+                    if mock_field(doc, key) not in value["$in"]:
+                        match = False
+                        break
+                elif key == "_id" and doc.get("_id") != value:
                     match = False
                     break
                 elif key == "mercadolibre_id" and doc.get("mercadolibre_id") != value:
@@ -55,24 +107,17 @@ class MockCursor:
                     match = False
                     break
                 elif key == "$or":
-                    # Handle $or queries
-                    or_match = False
-                    for or_condition in value:
-                        condition_match = True
-                        for or_key, or_value in or_condition.items():
-                            if doc.get(or_key) != or_value:
-                                condition_match = False
-                                break
-                        if condition_match:
-                            or_match = True
-                            break
-                    if not or_match:
+                    # Any condition may match; each one is a full query of its own
+                    if not any(MockCursor([doc], or_condition)._filtered_data for or_condition in value):
+                        match = False
+                        break
+                elif key == "$and":
+                    if not all(MockCursor([doc], and_condition)._filtered_data for and_condition in value):
                         match = False
                         break
                 elif isinstance(value, dict):
                     # Handle complex queries (regex, range, etc.)
                     if "$regex" in value:
-                        import re
                         pattern = value["$regex"]
                         flags = 0
                         if value.get("$options", "").find("i") >= 0:
@@ -100,7 +145,7 @@ class MockCursor:
                         if "$lt" in value and doc_value < value["$lt"]:
                             match = False
                             break
-                elif doc.get(key) != value:
+                elif mock_field(doc, key) != value:
                     match = False
                     break
             if match:
@@ -123,6 +168,15 @@ class MockCursor:
         self._limit_count = count
         return self
     
+    def batch_size(self, count):
+        """Batch size only affects round-trips, so it is ignored"""
+        return self
+    
+    async def __aiter__(self):
+        """Iterate the cursor results"""
+        for doc in await self.to_list():
+            yield doc
+    
     async def to_list(self, length=None):
         """Convert cursor to list"""
         result = self._filtered_data.copy()
@@ -142,26 +196,134 @@ class MockCursor:
         if self._limit_count:
             result = result[:self._limit_count]
         
-        return result
+        # Like the driver, hand out copies so callers can't mutate stored documents
+        return [_clone(doc) for doc in result]
+
+
+# $project is accepted but ignored, like projections passed to find()
+MOCK_PIPELINE_STAGES = {"$match", "$sort", "$skip", "$limit", "$count", "$facet", "$project", "$group"}
+
+
+def run_mock_pipeline(docs, pipeline):
+    """Evaluate a pipeline of simple aggregation stages over a list of documents"""
+    docs = list(docs)
+    for stage in pipeline:
+        name, spec = next(iter(stage.items()))
+        if name == "$match":
+            docs = MockCursor(docs, spec)._filtered_data
+        elif name == "$sort":
+            for field, direction in reversed(list(spec.items())):
+                try:
+                    docs.sort(key=lambda x: x.get(field, ""), reverse=direction == -1)
+                except TypeError:
+                    docs.sort(key=lambda x: str(x.get(field, "")), reverse=direction == -1)
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$facet":
+            docs = [{key: run_mock_pipeline(docs, sub_pipeline) for key, sub_pipeline in spec.items()}]
+        elif name == "$group":
+            docs = run_mock_group(docs, spec)
+    return docs
+
+
+def run_mock_group(docs, spec):
+    """Evaluate a $group stage supporting field/None keys and $sum/$avg/$push accumulators"""
+    def field_value(doc, expression):
+        return doc.get(expression[1:]) if isinstance(expression, str) and expression.startswith("$") else expression
+    
+    groups = {}
+    for doc in docs:
+        groups.setdefault(field_value(doc, spec["_id"]), []).append(doc)
+    
+    results = []
+    for key, group_docs in groups.items():
+        result = {"_id": key}
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            operator, expression = next(iter(accumulator.items()))
+            values = [field_value(doc, expression) for doc in group_docs]
+            numbers = [value for value in values if isinstance(value, (int, float))]
+            if operator == "$sum":
+                result[field] = sum(numbers)
+            elif operator == "$avg":
+                result[field] = sum(numbers) / len(numbers) if numbers else None
+            elif operator == "$push":
+                result[field] = [value for value in values if value is not None]
+        results.append(result)
+    return results
 
 
 class MockCollection:
-    """Mock MongoDB collection for testing"""
+    """Mock MongoDB collection for testing, indexed by _id, mercadolibre_id and canonical_vehicle_id"""
     
     def __init__(self):
         self.data = []
     
-    def find(self, query=None):
-        """Mock find method"""
-        return MockCursor(self.data, query or {})
+    @property
+    def data(self):
+        return self._data
     
-    async def find_one(self, query):
+    @data.setter
+    def data(self, documents):
+        """Replace the stored documents, rebuilding the indexes"""
+        self._data = documents
+        self._by_id = {}
+        self._by_ml_id = {}
+        self._by_canonical = defaultdict(list)
+        for doc in documents:
+            self._index(doc)
+    
+    def _index(self, doc):
+        if "_id" in doc:
+            self._by_id[doc["_id"]] = doc
+        if "mercadolibre_id" in doc:
+            self._by_ml_id[doc["mercadolibre_id"]] = doc
+        self._by_canonical[doc.get("canonical_vehicle_id")].append(doc)
+    
+    def _unindex(self, doc):
+        self._by_id.pop(doc.get("_id"), None)
+        self._by_ml_id.pop(doc.get("mercadolibre_id"), None)
+        self._by_canonical[doc.get("canonical_vehicle_id")].remove(doc)
+    
+    def _set_fields(self, doc, fields):
+        """Apply $set fields to a stored document, keeping the indexes current"""
+        self._unindex(doc)
+        doc.update(fields)
+        self._index(doc)
+    
+    def find(self, query=None, projection=None):
+        """Mock find method (projection is ignored)"""
+        query = query or {}
+        doc_id = query.get("_id")
+        if doc_id is not None and not isinstance(doc_id, dict):
+            doc = self._by_id.get(doc_id)
+            return MockCursor([doc] if doc is not None else [], query)
+        ml_ids = query.get("mercadolibre_id")
+        if isinstance(ml_ids, dict) and "$in" in ml_ids:
+            docs = [self._by_ml_id[ml_id] for ml_id in dict.fromkeys(ml_ids["$in"]) if ml_id in self._by_ml_id]
+            return MockCursor(docs, query)
+        canonical_id = query.get("canonical_vehicle_id")
+        if canonical_id is not None and not isinstance(canonical_id, dict):
+            # Narrow to the indexed listings; the cursor still applies the whole query
+            return MockCursor(self._by_canonical.get(canonical_id, []), query)
+        return MockCursor(self.data, query)
+    
+    async def find_one(self, query, projection=None):
         """Mock find_one method"""
-        for doc in self.data:
-            if "_id" in query and doc.get("_id") == query["_id"]:
-                return doc
-            elif "mercadolibre_id" in query and doc.get("mercadolibre_id") == query["mercadolibre_id"]:
-                return doc
+        doc = self._find_stored(query)
+        return _clone(doc) if doc is not None else None
+    
+    def _find_stored(self, query):
+        """The stored document matching an _id or mercadolibre_id query, for in-place writes"""
+        if "_id" in query:
+            return self._by_id.get(query["_id"])
+        if "mercadolibre_id" in query:
+            return self._by_ml_id.get(query["mercadolibre_id"])
         return None
     
     async def insert_one(self, document):
@@ -170,9 +332,10 @@ class MockCollection:
             def __init__(self, doc_id):
                 self.inserted_id = doc_id
         
-        doc_id = f"test_{len(self.data)}"
-        document["_id"] = doc_id
-        self.data.append(document.copy())
+        doc_id = document.setdefault("_id", ObjectId())
+        doc = _clone(document)
+        self.data.append(doc)
+        self._index(doc)
         return MockResult(doc_id)
     
     async def update_one(self, query, update):
@@ -181,12 +344,80 @@ class MockCollection:
             def __init__(self, modified_count):
                 self.modified_count = modified_count
         
-        for doc in self.data:
-            if "_id" in query and doc.get("_id") == query["_id"]:
+        doc = self._by_id.get(query["_id"]) if "_id" in query else None
+        if doc is None:
+            return MockResult(0)
+        if "$set" in update:
+            self._set_fields(doc, update["$set"])
+        return MockResult(1)
+    
+    async def update_many(self, query, update):
+        """Mock update_many method"""
+        class MockResult:
+            def __init__(self, modified_count):
+                self.modified_count = modified_count
+        
+        matched = MockCursor(self.data, query)._filtered_data
+        if "$set" in update:
+            for doc in matched:
+                self._set_fields(doc, update["$set"])
+        return MockResult(len(matched))
+    
+    async def create_index(self, keys, **kwargs):
+        """Mock create_index method (indexes are not enforced)"""
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+    
+    async def create_indexes(self, indexes):
+        """Mock create_indexes method (indexes are not enforced)"""
+        return [index.document["name"] for index in indexes]
+    
+    async def insert_many(self, documents, ordered=True):
+        """Mock insert_many method"""
+        class MockResult:
+            def __init__(self, doc_ids):
+                self.inserted_ids = doc_ids
+        
+        doc_ids = []
+        for document in documents:
+            result = await self.insert_one(document)
+            doc_ids.append(result.inserted_id)
+        return MockResult(doc_ids)
+    
+    async def bulk_write(self, requests, ordered=True):
+        """Mock bulk_write method (UpdateOne requests only)"""
+        class MockResult:
+            def __init__(self, modified_count, upserted_ids):
+                self.modified_count = modified_count
+                self.upserted_ids = upserted_ids
+        
+        modified_count = 0
+        upserted_ids = {}
+        for index, request in enumerate(requests):
+            query, update = request._filter, request._doc
+            doc = self._find_stored(query)
+            if doc:
                 if "$set" in update:
-                    doc.update(update["$set"])
-                return MockResult(1)
-        return MockResult(0)
+                    self._set_fields(doc, update["$set"])
+                    modified_count += 1
+            elif request._upsert:
+                document = {**query, **update.get("$setOnInsert", {}), **update.get("$set", {})}
+                result = await self.insert_one(document)
+                upserted_ids[index] = result.inserted_id
+        return MockResult(modified_count, upserted_ids)
+    
+    async def find_one_and_update(self, query, update, upsert=False, return_document=False, projection=None):
+        """Mock find_one_and_update method (projection is ignored)"""
+        doc = self._find_stored(query)
+        if doc:
+            before = _clone(doc)
+            if "$set" in update:
+                self._set_fields(doc, update["$set"])
+            return _clone(doc) if return_document else before
+        if upsert:
+            document = {**query, **update.get("$setOnInsert", {}), **update.get("$set", {})}
+            result = await self.insert_one(document)
+            return await self.find_one({"_id": result.inserted_id}) if return_document else None
+        return None
     
     async def count_documents(self, query=None):
         """Mock count_documents method"""
@@ -204,19 +435,32 @@ class MockCollection:
             def __init__(self, deleted_count):
                 self.deleted_count = deleted_count
         
-        for i, doc in enumerate(self.data):
-            if "_id" in query and doc.get("_id") == query["_id"]:
-                del self.data[i]
-                return MockResult(1)
-        return MockResult(0)
+        doc = self._by_id.get(query["_id"]) if "_id" in query else None
+        if doc is None:
+            return MockResult(0)
+        self.data.remove(doc)
+        self._unindex(doc)
+        return MockResult(1)
+
+    async def find_one_and_delete(self, query, projection=None):
+        """Mock find_one_and_delete method"""
+        doc = self._find_stored(query)
+        if doc is not None:
+            self.data.remove(doc)
+            self._unindex(doc)
+        return doc
     
-    def aggregate(self, pipeline):
+    async def aggregate(self, pipeline):
         """Mock aggregate method"""
         class MockAggregationCursor:
             def __init__(self, data):
                 self.data = data
             
             async def to_list(self, length=None):
+                # Pipelines made only of simple stages are evaluated; anything else gets basic stats
+                if pipeline and all(next(iter(stage)) in MOCK_PIPELINE_STAGES for stage in pipeline):
+                    return run_mock_pipeline(self.data, pipeline)
+                
                 # Simple aggregation - just return basic stats
                 if not self.data:
                     return [{"total_vehicles": 0, "avg_price": 0, "min_price": 0, "max_price": 0}]
@@ -267,13 +511,15 @@ def canonical_service(mock_database):
 @pytest.fixture
 def vehicle_service(mock_database):
     """Provide a vehicle service with mock database"""
+    # The vehicle cache is shared across service instances; start each test empty
+    vehicle_cache.clear()
     return VehicleService(mock_database)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_vehicle_data():
-    """Provide sample vehicle data for testing"""
-    return [
+    """Provide sample vehicle data for testing (validated once per session, never mutated)"""
+    return (
         VehicleCreate(
             title="Honda Civic 2020 LX Automático",
             mercadolibre_id="MCO123456789",
@@ -304,12 +550,61 @@ def sample_vehicle_data():
             price="87000000",
             price_numeric=87000000.0
         )
-    ]
+    )
+
+
+@pytest_asyncio.fixture
+async def seeded_service(vehicle_service, sample_vehicle_data):
+    """Provide a vehicle service with every sample vehicle already saved, in one bulk write"""
+    await vehicle_service.bulk_create_or_update(sample_vehicle_data)
+    return vehicle_service
+
+
+@pytest_asyncio.fixture(scope="class")
+async def search_service(sample_vehicle_data):
+    """Provide a vehicle service over its own database, seeded once per test class for read-only tests"""
+    service = VehicleService(MockDatabase())
+    await service.bulk_create_or_update(sample_vehicle_data)
+    return service
+
+
+# Validated once; make_vehicle clones it without re-running the validators
+_BASE_VEHICLE = VehicleCreate(title="", mercadolibre_id="x", url="x")
 
 
 @pytest.fixture
+def make_vehicle():
+    """Provide a VehicleCreate factory; overrides must already be typed (e.g. int years)"""
+    def factory(**overrides):
+        # model_copy would silently store a misspelled field, so reject anything the model lacks
+        unknown = overrides.keys() - VehicleCreate.model_fields.keys()
+        if unknown:
+            raise TypeError(f"make_vehicle() got unknown VehicleCreate fields: {sorted(unknown)}")
+        return _BASE_VEHICLE.model_copy(update=overrides)
+    return factory
+
+
+@pytest.fixture(scope="session")
+def expected_stats(sample_vehicle_data):
+    """Provide the vehicle stats expected once every sample vehicle is saved"""
+    prices = [vehicle.price_numeric for vehicle in sample_vehicle_data if vehicle.price_numeric]
+    return {
+        "total_vehicles": len(sample_vehicle_data),
+        "active_vehicles": len(sample_vehicle_data),
+        "sold_vehicles": 0,
+        "average_price": statistics.fmean(prices)
+    }
+
+
+@pytest.fixture(scope="module")
+def updated_vehicle_data(sample_vehicle_data):
+    """Provide the first sample vehicle re-scraped at a new price (shared per module, never mutated)"""
+    return sample_vehicle_data[0].model_copy(update={"price": "90000000", "price_numeric": 90000000.0})
+
+
+@pytest.fixture(scope="module")
 def sample_canonical_data():
-    """Provide sample canonical vehicle data for testing"""
+    """Provide sample canonical vehicle data for testing (shared per module, never mutated)"""
     return CanonicalVehicleCreate(
         brand="Honda",
         model="Civic",
@@ -117,8 +117,14 @@ def main():
         description += " (verbose)"
     
     if args.parallel:
-        cmd.extend(["-n", "auto"])
-        description += " (parallel)"
+        # Each xdist worker is its own process, so session- and class-scoped fixtures
+        # (mock databases, the event loop) are built per worker and never shared
+        try:
+            import xdist  # noqa: F401
+            cmd.extend(["-n", "auto", "-p", "no:cacheprovider"])
+            description += " (parallel)"
+        except ImportError:
+            print("⚠️ pytest-xdist not installed, running tests serially. Install it with: pip install pytest-xdist")
     
     if args.fast:
         cmd.extend(["-m", "not slow"])
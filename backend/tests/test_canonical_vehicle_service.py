@@ -3,23 +3,28 @@ Unit tests for CanonicalVehicleService.
 """
 
 import pytest
-from models.vehicle import VehicleCreate, CanonicalVehicleCreate
+from bson import ObjectId
+from models.vehicle import CanonicalVehicleCreate
 
 
 @pytest.mark.asyncio
 class TestCanonicalVehicleService:
     """Test cases for CanonicalVehicleService"""
     
-    async def test_create_canonical_vehicle(self, canonical_service, sample_canonical_data):
+    async def test_create_canonical_vehicle(self, canonical_service, sample_canonical_data, mock_database):
         """Test creating a new canonical vehicle"""
         canonical = await canonical_service.create_canonical_vehicle(sample_canonical_data)
         
         assert canonical is not None
         assert canonical.brand == "Honda"
         assert canonical.model == "Civic"
-        assert canonical.year == "2020"
+        assert canonical.year == 2020
         assert canonical.edition == "LX"
         assert canonical.canonical_title == "Honda Civic 2020 Lx"
+        
+        # Normalized match fields are stored with the document
+        stored = mock_database.canonical_vehicles.data[0]
+        assert stored["normalized"] == {"brand": "honda", "model": "civic", "edition": "lx"}
     
     async def test_find_or_create_canonical_vehicle_new(self, canonical_service, sample_vehicle_data):
         """Test finding or creating canonical vehicle for new vehicle"""
@@ -28,7 +33,7 @@ class TestCanonicalVehicleService:
         canonical_id = await canonical_service.find_or_create_canonical_vehicle(vehicle_data)
         
         assert canonical_id is not None
-        assert canonical_id.startswith("test_")
+        assert ObjectId.is_valid(canonical_id)
     
     async def test_find_or_create_canonical_vehicle_existing(self, canonical_service, sample_vehicle_data):
         """Test finding existing canonical vehicle for similar vehicle"""
@@ -43,15 +48,15 @@ class TestCanonicalVehicleService:
         
         assert canonical_id_1 == canonical_id_2
     
-    async def test_similarity_calculation_exact_match(self, canonical_service):
+    async def test_similarity_calculation_exact_match(self, canonical_service, make_vehicle):
         """Test similarity calculation for exact match"""
-        vehicle_data = VehicleCreate(
+        vehicle_data = make_vehicle(
             title="Honda Civic 2020 LX",
             mercadolibre_id="test1",
             url="test",
             brand="Honda",
             model="Civic",
-            year="2020",
+            year=2020,
             edition="LX",
             engine="1.5L Turbo"
         )
@@ -59,7 +64,7 @@ class TestCanonicalVehicleService:
         canonical_data = {
             "brand": "Honda",
             "model": "Civic",
-            "year": "2020",
+            "year": 2020,
             "edition": "LX",
             "engine": "1.5L Turbo"
         }
@@ -67,15 +72,15 @@ class TestCanonicalVehicleService:
         similarity = canonical_service._calculate_similarity(vehicle_data, canonical_data)
         assert similarity == 1.0
     
-    async def test_similarity_calculation_different_brand(self, canonical_service):
+    async def test_similarity_calculation_different_brand(self, canonical_service, make_vehicle):
         """Test similarity calculation for different brand"""
-        vehicle_data = VehicleCreate(
+        vehicle_data = make_vehicle(
             title="Toyota Corolla 2020 XEI",
             mercadolibre_id="test2",
             url="test",
             brand="Toyota",
             model="Corolla",
-            year="2020",
+            year=2020,
             edition="XEI",
             engine="2.0L"
         )
@@ -91,15 +96,15 @@ class TestCanonicalVehicleService:
         similarity = canonical_service._calculate_similarity(vehicle_data, canonical_data)
         assert similarity < 0.5  # Should be low similarity for different brand
     
-    async def test_similarity_calculation_different_year(self, canonical_service):
+    async def test_similarity_calculation_different_year(self, canonical_service, make_vehicle):
         """Test similarity calculation for different year"""
-        vehicle_data = VehicleCreate(
+        vehicle_data = make_vehicle(
             title="Honda Civic 2019 LX",
             mercadolibre_id="test3",
             url="test",
             brand="Honda",
             model="Civic",
-            year="2019",
+            year=2019,
             edition="LX",
             engine="1.5L Turbo"
         )
@@ -115,6 +120,45 @@ class TestCanonicalVehicleService:
         similarity = canonical_service._calculate_similarity(vehicle_data, canonical_data)
         assert 0.8 <= similarity <= 0.95  # Should be high but not perfect for different year
     
+    def test_similarity_batch_matches_single_scores(self, canonical_service, make_vehicle):
+        """Test batched similarity scores match per-candidate scores"""
+        vehicle_data = make_vehicle(
+            title="Honda Civic 2020 LX",
+            mercadolibre_id="test4",
+            url="test",
+            brand="Honda",
+            model="Civic",
+            year=2020,
+            edition="LX",
+            engine="1.5L Turbo"
+        )
+        
+        candidates = [
+            {"brand": "Toyota", "model": "Corolla", "year": 2020, "edition": "XEI", "engine": "2.0L"},
+            {"brand": "Honda", "model": "Civic", "year": 2020, "edition": "LX", "engine": "1.5 Turbo"},
+            {"brand": "Honda", "model": "Civic", "year": 2019, "edition": "LX"},
+            {"brand": "Honda", "model": "Civic"}
+        ]
+        
+        scores = canonical_service._calculate_similarity_batch(vehicle_data, candidates)
+        
+        assert len(scores) == len(candidates)
+        # Only the year matches exactly; the other fields score partial string ratios
+        assert scores[0] == pytest.approx(0.4126, abs=1e-4)
+        # "1.5 Turbo" is a similar engine
+        assert scores[1] == 1.0
+        # Different year over the four fields present: 0.7 / 0.9
+        assert scores[2] == pytest.approx(7 / 9)
+        # Fields missing on the canonical vehicle don't count against it
+        assert scores[3] == 1.0
+        
+        # The single-candidate path returns the same scores
+        assert canonical_service._calculate_similarity(vehicle_data, candidates[2]) == pytest.approx(7 / 9)
+        
+        # Candidates that cannot reach the threshold may stop early, but stay below it
+        thresholded = canonical_service._calculate_similarity_batch(vehicle_data, candidates, threshold=0.9)
+        assert list(thresholded >= 0.9) == list(scores >= 0.9)
+    
     def test_normalize_string(self, canonical_service):
         """Test string normalization function"""
         # Test case variations
@@ -176,6 +220,21 @@ class TestCanonicalVehicleService:
         assert canonical_service._extract_body_type("Honda Civic 2020") is None
         assert canonical_service._extract_body_type("") is None
     
+    async def test_merge_canonical_vehicles_invalidates_cache(self, vehicle_service, canonical_service, sample_vehicle_data, sample_canonical_data):
+        """Test merged listings are not served from the vehicle cache with the old canonical"""
+        created = await vehicle_service.create_or_update_vehicle(sample_vehicle_data[0])
+        vehicle_id = str(created["_id"])
+        source_id = created["canonical_vehicle_id"]
+        target = await canonical_service.create_canonical_vehicle(sample_canonical_data)
+        
+        cached = await vehicle_service.get_vehicle_by_id(vehicle_id)
+        assert cached.canonical_vehicle_id == source_id
+        
+        assert await canonical_service.merge_canonical_vehicles(source_id, target.id) is True
+        
+        vehicle = await vehicle_service.get_vehicle_by_id(vehicle_id)
+        assert vehicle.canonical_vehicle_id == target.id
+    
     async def test_update_canonical_vehicle_stats(self, canonical_service, mock_database):
         """Test updating canonical vehicle statistics"""
         # Create a canonical vehicle
@@ -3,6 +3,7 @@ Integration tests for the canonical vehicle system.
 Tests the full flow from vehicle creation to canonical grouping.
 """
 
+import asyncio
 import pytest
 from models.vehicle import VehicleCreate
 
@@ -14,7 +15,8 @@ class TestCanonicalVehicleIntegration:
     async def test_full_grouping_workflow(self, vehicle_service, canonical_service):
         """Test complete workflow from vehicle creation to canonical grouping"""
         
-        # Create test vehicles that should be grouped together
+        # Create test vehicles that should be grouped together; built through the validating
+        # constructor (scraped years arrive as strings) rather than the make_vehicle factory
         similar_vehicles = [
             VehicleCreate(
                 title="Honda Civic 2020 LX Automático",
@@ -76,7 +78,7 @@ class TestCanonicalVehicleIntegration:
         assert canonical is not None
         assert canonical.brand.lower() == "honda"
         assert canonical.model.lower() == "civic"
-        assert canonical.year == "2020"
+        assert canonical.year == 2020
         assert canonical.edition.lower() == "lx"
         
         # Update canonical vehicle statistics
@@ -98,50 +100,49 @@ class TestCanonicalVehicleIntegration:
         for listing in listings:
             assert listing.canonical_vehicle_id == canonical_id
     
-    async def test_different_vehicles_separate_canonicals(self, vehicle_service, canonical_service):
+    async def test_different_vehicles_separate_canonicals(self, vehicle_service, canonical_service, make_vehicle):
         """Test that different vehicles create separate canonical vehicles"""
         
         different_vehicles = [
-            VehicleCreate(
+            make_vehicle(
                 title="Honda Civic 2020 LX",
                 mercadolibre_id="MCO101",
                 url="https://auto.mercadolibre.com.co/MCO-101",
                 brand="Honda",
                 model="Civic",
-                year="2020",
+                year=2020,
                 edition="LX",
                 price="85000000",
                 price_numeric=85000000.0
             ),
-            VehicleCreate(
+            make_vehicle(
                 title="Honda Civic 2019 LX",  # Different year
                 mercadolibre_id="MCO102",
                 url="https://auto.mercadolibre.com.co/MCO-102",
                 brand="Honda",
                 model="Civic",
-                year="2019",
+                year=2019,
                 edition="LX",
                 price="78000000",
                 price_numeric=78000000.0
             ),
-            VehicleCreate(
+            make_vehicle(
                 title="Toyota Corolla 2020 XEI",  # Different brand/model
                 mercadolibre_id="MCO103",
                 url="https://auto.mercadolibre.com.co/MCO-103",
                 brand="Toyota",
                 model="Corolla",
-                year="2020",
+                year=2020,
                 edition="XEI",
                 price="92000000",
                 price_numeric=92000000.0
             )
         ]
         
-        # Create vehicles
-        created_vehicles = []
-        for vehicle_data in different_vehicles:
-            vehicle = await vehicle_service.create_or_update_vehicle(vehicle_data)
-            created_vehicles.append(vehicle)
+        # Create vehicles; none can group with another, so they are saved concurrently
+        created_vehicles = await asyncio.gather(
+            *(vehicle_service.create_or_update_vehicle(vehicle_data) for vehicle_data in different_vehicles)
+        )
         
         # Get all unique canonical IDs
         canonical_ids = set()
@@ -160,17 +161,17 @@ class TestCanonicalVehicleIntegration:
             listings = await canonical_service.get_listings_for_canonical(canonical_id)
             assert len(listings) == 1  # Each should have exactly one listing
     
-    async def test_price_update_workflow(self, vehicle_service, canonical_service, mock_database):
+    async def test_price_update_workflow(self, vehicle_service, canonical_service, mock_database, make_vehicle):
         """Test price update workflow with canonical vehicles"""
         
         # Create a vehicle
-        vehicle_data = VehicleCreate(
+        vehicle_data = make_vehicle(
             title="Honda Civic 2020 LX",
             mercadolibre_id="MCO201",
             url="https://auto.mercadolibre.com.co/MCO-201",
             brand="Honda",
             model="Civic",
-            year="2020",
+            year=2020,
             edition="LX",
             price="85000000",
             price_numeric=85000000.0
@@ -180,16 +181,8 @@ class TestCanonicalVehicleIntegration:
         canonical_id = created_vehicle["canonical_vehicle_id"]
         
         # Update vehicle with new price
-        updated_vehicle_data = VehicleCreate(
-            title=vehicle_data.title,
-            mercadolibre_id=vehicle_data.mercadolibre_id,
-            url=vehicle_data.url,
-            brand=vehicle_data.brand,
-            model=vehicle_data.model,
-            year=vehicle_data.year,
-            edition=vehicle_data.edition,
-            price="90000000",
-            price_numeric=90000000.0
+        updated_vehicle_data = vehicle_data.model_copy(
+            update={"price": "90000000", "price_numeric": 90000000.0}
         )
         
         updated_vehicle = await vehicle_service.create_or_update_vehicle(updated_vehicle_data)
@@ -198,8 +191,8 @@ class TestCanonicalVehicleIntegration:
         assert updated_vehicle["price_numeric"] == 90000000.0
         assert updated_vehicle["canonical_vehicle_id"] == canonical_id  # Same canonical
         
-        # Verify price history was recorded
-        assert len(mock_database.price_history.data) >= 1
+        # Verify price history was recorded for both saves
+        assert len(mock_database.price_history.data) == 2
         
         # Update canonical statistics
         await canonical_service.update_canonical_vehicle_stats(canonical_id)
@@ -210,34 +203,34 @@ class TestCanonicalVehicleIntegration:
         assert canonical.max_price == 90000000.0
         assert canonical.avg_price == 90000000.0
     
-    async def test_search_canonical_vehicles(self, vehicle_service, canonical_service):
+    async def test_search_canonical_vehicles(self, vehicle_service, canonical_service, make_vehicle):
         """Test searching canonical vehicles"""
         
         # Create vehicles from different brands
         test_vehicles = [
-            VehicleCreate(
+            make_vehicle(
                 title="Honda Civic 2020 LX",
                 mercadolibre_id="MCO301",
-                url="test", brand="Honda", model="Civic", year="2020",
+                url="test", brand="Honda", model="Civic", year=2020,
                 price_numeric=85000000.0
             ),
-            VehicleCreate(
+            make_vehicle(
                 title="Honda Accord 2020 EX",
                 mercadolibre_id="MCO302", 
-                url="test", brand="Honda", model="Accord", year="2020",
+                url="test", brand="Honda", model="Accord", year=2020,
                 price_numeric=135000000.0
             ),
-            VehicleCreate(
+            make_vehicle(
                 title="Toyota Corolla 2020 XEI",
                 mercadolibre_id="MCO303",
-                url="test", brand="Toyota", model="Corolla", year="2020",
+                url="test", brand="Toyota", model="Corolla", year=2020,
                 price_numeric=92000000.0
             )
         ]
         
-        # Create vehicles
-        for vehicle_data in test_vehicles:
-            await vehicle_service.create_or_update_vehicle(vehicle_data)
+        # Create vehicles in one batch, as the scraper does
+        counts = await vehicle_service.bulk_create_or_update(test_vehicles)
+        assert counts["created"] == 3
         
         # Search all canonical vehicles
         result = await canonical_service.get_canonical_vehicles_with_listings()
@@ -254,27 +247,27 @@ class TestCanonicalVehicleIntegration:
         for canonical in honda_result["canonical_vehicles"]:
             assert canonical.brand == "Honda"
     
-    async def test_market_analysis(self, vehicle_service, canonical_service):
+    async def test_market_analysis(self, vehicle_service, canonical_service, make_vehicle):
         """Test market analysis for canonical vehicles"""
         
         # Create multiple listings for the same canonical vehicle
         similar_vehicles = [
-            VehicleCreate(
+            make_vehicle(
                 title="Honda Civic 2020 LX - Bogotá",
                 mercadolibre_id="MCO401",
-                url="test", brand="Honda", model="Civic", year="2020", edition="LX",
+                url="test", brand="Honda", model="Civic", year=2020, edition="LX",
                 price_numeric=85000000.0, location="Bogotá"
             ),
-            VehicleCreate(
+            make_vehicle(
                 title="Honda Civic 2020 LX - Medellín",
                 mercadolibre_id="MCO402",
-                url="test", brand="Honda", model="Civic", year="2020", edition="LX",
+                url="test", brand="Honda", model="Civic", year=2020, edition="LX",
                 price_numeric=87000000.0, location="Medellín"
             ),
-            VehicleCreate(
+            make_vehicle(
                 title="Honda Civic 2020 LX - Cali",
                 mercadolibre_id="MCO403",
-                url="test", brand="Honda", model="Civic", year="2020", edition="LX",
+                url="test", brand="Honda", model="Civic", year=2020, edition="LX",
                 price_numeric=84000000.0, location="Cali"
             )
         ]
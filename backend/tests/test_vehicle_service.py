@@ -2,8 +2,9 @@
 Unit tests for VehicleService.
 """
 
+import asyncio
 import pytest
-from models.vehicle import VehicleCreate, VehicleUpdate, VehicleStatus
+from models.vehicle import VehicleCreate, VehicleUpdate, VehicleStatus, VehicleSearchFilters
 from datetime import datetime
 
 
@@ -11,7 +12,7 @@ from datetime import datetime
 class TestVehicleService:
     """Test cases for VehicleService"""
     
-    async def test_create_or_update_vehicle_new(self, vehicle_service, sample_vehicle_data):
+    async def test_create_or_update_vehicle_new(self, vehicle_service, sample_vehicle_data, mock_database):
         """Test creating a new vehicle"""
         vehicle_data = sample_vehicle_data[0]
         
@@ -23,8 +24,11 @@ class TestVehicleService:
         assert result["model"] == vehicle_data.model
         assert result["canonical_vehicle_id"] is not None
         assert result["status"] == VehicleStatus.ACTIVE
+        
+        # The returned document is what was stored
+        assert mock_database.vehicles.data == [result]
     
-    async def test_create_or_update_vehicle_existing(self, vehicle_service, sample_vehicle_data):
+    async def test_create_or_update_vehicle_existing(self, vehicle_service, sample_vehicle_data, updated_vehicle_data):
         """Test updating an existing vehicle"""
         vehicle_data = sample_vehicle_data[0]
         
@@ -32,23 +36,58 @@ class TestVehicleService:
         created = await vehicle_service.create_or_update_vehicle(vehicle_data)
         
         # Update with new price
-        updated_data = VehicleCreate(
-            title=vehicle_data.title,
-            mercadolibre_id=vehicle_data.mercadolibre_id,
-            url=vehicle_data.url,
-            brand=vehicle_data.brand,
-            model=vehicle_data.model,
-            year=vehicle_data.year,
-            price="90000000",
-            price_numeric=90000000.0
-        )
-        
-        result = await vehicle_service.create_or_update_vehicle(updated_data)
+        result = await vehicle_service.create_or_update_vehicle(updated_vehicle_data)
         
         assert result is not None
         assert result["_id"] == created["_id"]  # Same vehicle
         assert result["price_numeric"] == 90000000.0  # Updated price
-    
+
+    async def test_bulk_create_or_update(self, vehicle_service, sample_vehicle_data, updated_vehicle_data, mock_database):
+        """Test saving a batch of new and existing vehicles at once"""
+        created = await vehicle_service.create_or_update_vehicle(sample_vehicle_data[0])
+
+        counts = await vehicle_service.bulk_create_or_update([updated_vehicle_data, sample_vehicle_data[1]])
+
+        assert counts == {"created": 1, "updated": 1, "failed": 0}
+        assert len(mock_database.vehicles.data) == 2
+
+        existing = await vehicle_service.vehicles_collection.find_one({"_id": created["_id"]})
+        assert existing["price_numeric"] == 90000000.0
+
+        new_vehicle = await vehicle_service.vehicles_collection.find_one({"mercadolibre_id": sample_vehicle_data[1].mercadolibre_id})
+        assert new_vehicle["canonical_vehicle_id"] is not None
+        assert new_vehicle["status"] == VehicleStatus.ACTIVE
+
+        # One price record from the first save, plus one per vehicle in the batch
+        assert len(mock_database.price_history.data) == 3
+
+    async def test_bulk_create_or_update_concurrent_insert(self, vehicle_service, sample_vehicle_data, mock_database, monkeypatch):
+        """Test a listing inserted by another writer mid-batch is updated with the scraped data"""
+        vehicle_data = sample_vehicle_data[1]
+        collection = vehicle_service.vehicles_collection
+        bulk_write = collection.bulk_write
+
+        async def insert_then_bulk_write(requests, ordered=True):
+            # Another writer inserts the listing after the service's find, before its bulk_write
+            if not collection.data:
+                await collection.insert_one({"mercadolibre_id": vehicle_data.mercadolibre_id, "price_numeric": 70000000.0})
+            return await bulk_write(requests, ordered=ordered)
+
+        monkeypatch.setattr(collection, "bulk_write", insert_then_bulk_write)
+
+        counts = await vehicle_service.bulk_create_or_update([vehicle_data])
+
+        assert counts == {"created": 0, "updated": 1, "failed": 0}
+        assert len(collection.data) == 1
+
+        stored = collection.data[0]
+        assert stored["price_numeric"] == vehicle_data.price_numeric
+        assert stored["previous_price_numeric"] == 70000000.0
+
+        # The scraped price is recorded against the other writer's document
+        assert len(mock_database.price_history.data) == 1
+        assert mock_database.price_history.data[0]["metadata"]["vehicle_id"] == str(stored["_id"])
+
     async def test_get_vehicle_by_id(self, vehicle_service, sample_vehicle_data):
         """Test getting vehicle by ID"""
         vehicle_data = sample_vehicle_data[0]
@@ -64,6 +103,53 @@ class TestVehicleService:
         assert vehicle.id == vehicle_id
         assert vehicle.mercadolibre_id == vehicle_data.mercadolibre_id
     
+    async def test_get_vehicle_by_id_cached(self, vehicle_service, sample_vehicle_data, mock_database):
+        """Test repeated lookups are served from the cache until the vehicle is written"""
+        vehicle_data = sample_vehicle_data[0]
+        await vehicle_service.create_or_update_vehicle(vehicle_data)
+
+        # Non-ObjectId ids fall back to the MercadoLibre ID
+        first = await vehicle_service.get_vehicle_by_id(vehicle_data.mercadolibre_id)
+        mock_database.vehicles.data[0]["price_numeric"] = 1.0
+        cached = await vehicle_service.get_vehicle_by_id(vehicle_data.mercadolibre_id)
+        assert cached == first
+
+        # Each lookup gets its own copy of the cached vehicle
+        cached.price_numeric = 2.0
+        assert (await vehicle_service.get_vehicle_by_id(vehicle_data.mercadolibre_id)).price_numeric == first.price_numeric
+
+        # Saving the vehicle invalidates its cached copy
+        await vehicle_service.create_or_update_vehicle(vehicle_data.model_copy(update={"price_numeric": 90000000.0}))
+        vehicle = await vehicle_service.get_vehicle_by_id(vehicle_data.mercadolibre_id)
+        assert vehicle.price_numeric == 90000000.0
+
+    async def test_get_vehicle_by_id_overlapping_write(self, vehicle_service, sample_vehicle_data, monkeypatch):
+        """Test a read that overlaps a write does not put the old document back in the cache"""
+        created = await vehicle_service.create_or_update_vehicle(sample_vehicle_data[0])
+        vehicle_id = str(created["_id"])
+        collection = vehicle_service.vehicles_collection
+        find_one = collection.find_one
+        read_done = asyncio.Event()
+        write_done = asyncio.Event()
+
+        async def slow_find_one(query, projection=None):
+            # Read the old document, then return it only after the write has landed
+            document = await find_one(query, projection)
+            read_done.set()
+            await write_done.wait()
+            return document
+
+        monkeypatch.setattr(collection, "find_one", slow_find_one)
+        read = asyncio.create_task(vehicle_service.get_vehicle_by_id(vehicle_id))
+        await read_done.wait()
+        await vehicle_service.update_vehicle(vehicle_id, VehicleUpdate(title="Updated title"))
+        write_done.set()
+        assert (await read).title == sample_vehicle_data[0].title
+
+        # The overlapping read was not cached, so the next lookup sees the write
+        vehicle = await vehicle_service.get_vehicle_by_id(vehicle_id)
+        assert vehicle.title == "Updated title"
+
     async def test_get_vehicle_by_mercadolibre_id(self, vehicle_service, sample_vehicle_data):
         """Test getting vehicle by MercadoLibre ID"""
         vehicle_data = sample_vehicle_data[0]
@@ -97,7 +183,7 @@ class TestVehicleService:
         assert updated.price_numeric == 95000000.0
         assert updated.brand == vehicle_data.brand  # Other fields unchanged
     
-    async def test_delete_vehicle(self, vehicle_service, sample_vehicle_data):
+    async def test_delete_vehicle(self, vehicle_service, sample_vehicle_data, mock_database):
         """Test deleting a vehicle"""
         vehicle_data = sample_vehicle_data[0]
         
@@ -111,88 +197,121 @@ class TestVehicleService:
         assert success is True
         
         # Verify vehicle is deleted
-        deleted_vehicle = await vehicle_service.get_vehicle_by_id(vehicle_id)
-        assert deleted_vehicle is None
+        assert mock_database.vehicles.data == []
     
-    async def test_search_vehicles_basic(self, vehicle_service, sample_vehicle_data):
-        """Test basic vehicle search"""
-        # Create multiple vehicles
-        for vehicle_data in sample_vehicle_data:
-            await vehicle_service.create_or_update_vehicle(vehicle_data)
-        
-        from models.vehicle import VehicleSearchFilters
+    async def test_update_and_delete_vehicle_by_mercadolibre_id(self, vehicle_service, sample_vehicle_data, mock_database):
+        """Test ids that are not ObjectIds resolve by MercadoLibre ID"""
+        vehicle_data = sample_vehicle_data[0]
+        await vehicle_service.create_or_update_vehicle(vehicle_data)
         
-        # Search all vehicles
-        filters = VehicleSearchFilters()
-        result = await vehicle_service.search_vehicles(filters)
+        updated = await vehicle_service.update_vehicle(vehicle_data.mercadolibre_id, VehicleUpdate(price_numeric=95000000.0))
+        assert updated.price_numeric == 95000000.0
         
-        assert result.total_count == len(sample_vehicle_data)
-        assert len(result.vehicles) == len(sample_vehicle_data)
-        assert result.page == 1
-        assert result.has_next is False
-        assert result.has_previous is False
+        assert await vehicle_service.delete_vehicle(vehicle_data.mercadolibre_id) is True
+        assert mock_database.vehicles.data == []
     
-    async def test_search_vehicles_with_filters(self, vehicle_service, sample_vehicle_data):
-        """Test vehicle search with filters"""
-        # Create multiple vehicles
-        for vehicle_data in sample_vehicle_data:
-            await vehicle_service.create_or_update_vehicle(vehicle_data)
-        
-        from models.vehicle import VehicleSearchFilters
-        
-        # Search for Honda vehicles only
-        filters = VehicleSearchFilters(brand="Honda")
+    @pytest.mark.parametrize("filters,page_size,expected", [
+        # Both sample vehicles fit in one page
+        pytest.param(VehicleSearchFilters(), 20, {"total_count": 2, "page": 1, "has_next": False, "has_previous": False}, id="no_filter"),
+        # Two Honda vehicles in sample data
+        pytest.param(VehicleSearchFilters(brand="Honda"), 20, {"total_count": 2}, id="honda"),
+        # 2 vehicles / 2 per page = 1 page
+        pytest.param(VehicleSearchFilters(), 2, {"page_size": 2, "total_pages": 1, "has_next": False, "has_previous": False}, id="paginate"),
+    ])
+    async def test_search_vehicles(self, search_service, filters, page_size, expected):
+        """Test vehicle search with and without filters and pagination"""
+        result = await search_service.search_vehicles(filters, page=1, page_size=page_size)
+        
+        assert {field: getattr(result, field) for field in expected} == expected
+        assert len(result.vehicles) == result.total_count
+        if filters.brand:
+            for vehicle in result.vehicles:
+                assert vehicle.brand == filters.brand
+
+    async def test_search_vehicles_prefix_filters(self, search_service):
+        """Test text filters match case-insensitive prefixes and treat input literally"""
+        result = await search_service.search_vehicles(VehicleSearchFilters(brand="hon"))
+        assert result.total_count == 2
+
+        # Not a prefix of the brand
+        result = await search_service.search_vehicles(VehicleSearchFilters(brand="onda"))
+        assert result.total_count == 0
+
+        # Regex metacharacters are escaped rather than interpreted
+        result = await search_service.search_vehicles(VehicleSearchFilters(brand="hon.*"))
+        assert result.total_count == 0
+
+    async def test_search_vehicles_partial_terms(self, search_service):
+        """Test free-text search matches partial words and requires every term"""
+        result = await search_service.search_vehicles(VehicleSearchFilters(search_query="civ"))
+        assert result.total_count == 2
+
+        result = await search_service.search_vehicles(VehicleSearchFilters(search_query="HOND civ"))
+        assert result.total_count == 2
+
+        # Every term must match
+        result = await search_service.search_vehicles(VehicleSearchFilters(search_query="civ toyo"))
+        assert result.total_count == 0
+
+    async def test_search_vehicles_kilometers_range(self, vehicle_service, sample_vehicle_data):
+        """Test kilometers range filters against the numeric value parsed at ingest"""
+        await vehicle_service.create_or_update_vehicle(sample_vehicle_data[0].model_copy(update={"kilometers": "45.000 Km"}))
+        await vehicle_service.create_or_update_vehicle(sample_vehicle_data[1].model_copy(update={"kilometers": "120.000 Km"}))
+
+        # Numeric range, not a substring match on the kilometers text
+        filters = VehicleSearchFilters(min_kilometers=10000, max_kilometers=100000)
         result = await vehicle_service.search_vehicles(filters)
-        
-        assert result.total_count == 2  # Two Honda vehicles in sample data
-        for vehicle in result.vehicles:
-            assert vehicle.brand == "Honda"
-    
-    async def test_search_vehicles_pagination(self, vehicle_service, sample_vehicle_data):
-        """Test vehicle search pagination"""
-        # Create multiple vehicles
-        for vehicle_data in sample_vehicle_data:
-            await vehicle_service.create_or_update_vehicle(vehicle_data)
-        
-        from models.vehicle import VehicleSearchFilters
-        
-        # Search with pagination
-        filters = VehicleSearchFilters()
-        result = await vehicle_service.search_vehicles(filters, page=1, page_size=2)
-        
-        assert result.page_size == 2
-        assert len(result.vehicles) == 2
-        assert result.total_pages == 1  # 2 vehicles / 2 per page = 1 page
-        assert result.has_next is False  # No more pages since all vehicles fit in one page
-        assert result.has_previous is False
-    
-    async def test_get_recent_vehicles(self, vehicle_service, sample_vehicle_data):
+
+        assert result.total_count == 1
+        assert result.vehicles[0].kilometers_numeric == 45000
+
+    async def test_search_vehicles_year_range(self, vehicle_service, sample_vehicle_data):
+        """Test year range filters against years stored as ints"""
+        # Different years never share a canonical vehicle, so the saves are independent
+        await asyncio.gather(
+            vehicle_service.create_or_update_vehicle(sample_vehicle_data[0].model_copy(update={"year": 2018})),
+            vehicle_service.create_or_update_vehicle(sample_vehicle_data[1])
+        )
+
+        filters = VehicleSearchFilters(min_year=2019, max_year=2021)
+        result = await vehicle_service.search_vehicles(filters)
+
+        assert result.total_count == 1
+        assert result.vehicles[0].year == 2020
+
+        # Scraped placeholders are not years
+        assert VehicleCreate(title="Test", mercadolibre_id="MCO1", url="https://example.com", year="Not found").year is None
+
+    async def test_get_recent_vehicles(self, seeded_service):
         """Test getting recent vehicles"""
-        # Create vehicles
-        for vehicle_data in sample_vehicle_data:
-            await vehicle_service.create_or_update_vehicle(vehicle_data)
-        
-        recent = await vehicle_service.get_recent_vehicles(limit=2)
+        recent = await seeded_service.get_recent_vehicles(limit=2)
         
         assert len(recent) == 2
         for vehicle in recent:
             assert vehicle.status == VehicleStatus.ACTIVE
     
-    async def test_get_vehicle_stats(self, vehicle_service, sample_vehicle_data):
+    async def test_get_price_drops(self, seeded_service, sample_vehicle_data):
+        """Test price drops are read from the price change stored on each save"""
+        dropped = sample_vehicle_data[0]
+        await seeded_service.create_or_update_vehicle(dropped.model_copy(update={"price_numeric": dropped.price_numeric * 0.9}))
+        # Unchanged price is not a drop
+        await seeded_service.create_or_update_vehicle(sample_vehicle_data[1])
+
+        drops = await seeded_service.get_price_drops(hours=1)
+
+        assert len(drops) == 1
+        assert drops[0]["vehicle"].mercadolibre_id == dropped.mercadolibre_id
+        assert drops[0]["previous_price"] == dropped.price_numeric
+        assert drops[0]["price_drop_percentage"] == pytest.approx(10.0)
+
+    async def test_get_vehicle_stats(self, seeded_service, expected_stats):
         """Test getting vehicle statistics"""
-        # Create vehicles
-        for vehicle_data in sample_vehicle_data:
-            await vehicle_service.create_or_update_vehicle(vehicle_data)
+        stats = await seeded_service.get_vehicle_stats()
         
-        stats = await vehicle_service.get_vehicle_stats()
-        
-        assert stats["total_vehicles"] == len(sample_vehicle_data)
-        assert stats["active_vehicles"] == len(sample_vehicle_data)
-        assert stats["sold_vehicles"] == 0
-        assert "average_price" in stats
+        assert {field: stats[field] for field in expected_stats} == expected_stats
         assert "last_updated" in stats
     
-    async def test_price_history_recording(self, vehicle_service, sample_vehicle_data, mock_database):
+    async def test_price_history_recording(self, vehicle_service, sample_vehicle_data, updated_vehicle_data, mock_database):
         """Test that price changes are recorded in price history"""
         vehicle_data = sample_vehicle_data[0]
         
@@ -200,23 +319,12 @@ class TestVehicleService:
         created = await vehicle_service.create_or_update_vehicle(vehicle_data)
         
         # Update with new price
-        updated_data = VehicleCreate(
-            title=vehicle_data.title,
-            mercadolibre_id=vehicle_data.mercadolibre_id,
-            url=vehicle_data.url,
-            brand=vehicle_data.brand,
-            model=vehicle_data.model,
-            year=vehicle_data.year,
-            price="90000000",
-            price_numeric=90000000.0
-        )
-        
-        await vehicle_service.create_or_update_vehicle(updated_data)
+        await vehicle_service.create_or_update_vehicle(updated_vehicle_data)
         
-        # Check that price history was recorded
-        assert len(mock_database.price_history.data) >= 1
+        # One price record per save: the creation and the update
+        assert len(mock_database.price_history.data) == 2
         
         # Verify price history content
-        price_record = mock_database.price_history.data[-1]
+        price_record = mock_database.price_history.data[1]
         assert price_record["price_numeric"] == 90000000.0
         assert price_record["metadata"]["mercadolibre_id"] == vehicle_data.mercadolibre_id 
\ No newline at end of file
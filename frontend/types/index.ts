@@ -138,7 +138,7 @@ export interface Vehicle {
   price_numeric?: number | null;
   mercadolibre_id: string;
   url: string;
-  year?: string | null;
+  year?: number | null;
   kilometers?: string | null;
   location?: string | null;
   image_url?: string | null;
@@ -171,7 +171,7 @@ export interface VehicleUpdate {
   title?: string | null;
   price?: string | null;
   price_numeric?: number | null;
-  year?: string | null;
+  year?: number | null;
   kilometers?: string | null;
   location?: string | null;
   image_url?: string | null;
@@ -209,7 +209,7 @@ export interface CanonicalVehicle {
   _id?: string | null;
   brand: string;
   model: string;
-  year?: string | null;
+  year?: number | null;
   edition?: string | null;
   engine?: string | null;
   transmission?: string | null;
@@ -243,7 +243,7 @@ export enum CanonicalVehicleStatus {
 export interface CanonicalVehicleCreate {
   brand: string;
   model: string;
-  year?: string | null;
+  year?: number | null;
   edition?: string | null;
   engine?: string | null;
   transmission?: string | null;
@@ -258,7 +258,7 @@ export interface CanonicalVehicleCreate {
 export interface CanonicalVehicleUpdate {
   brand?: string | null;
   model?: string | null;
-  year?: string | null;
+  year?: number | null;
   edition?: string | null;
   engine?: string | null;
   transmission?: string | null;